@@ -1,12 +1,25 @@
-from fastapi import APIRouter, Query
-from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from typing import List, Optional
+import asyncio
+import json
+import time
 from ..services.google_search import GoogleSearchService
 from ..services.youtube_search import YouTubeSearchService
 from ..services.reddit_search import RedditSearchService
 from ..services.scholar_search import ScholarSearchService
-from ..models.search import SearchResponse
+from ..services.federated_search import FederatedSearchService
+from ..services.prefetch import Prefetcher
+from ..services.enrichment import EnrichmentJob, EnrichmentQueue
+from ..models.search import SearchResponse, SearchResult
 from ..services.autocomplete_service import AutocompleteService
 from ..services.ai_service import AIService
+from ..utils.http import http_client
+from ..utils.metrics import metrics, span
+from ..utils.quota import quota_scheduler
+from ..utils.resilience import upstreams
+from ..config import settings
+from ..utils.cache import search_cache, channel_cache, inference_cache, search_flight, cache_policies
 
 router = APIRouter()
 
@@ -15,77 +28,309 @@ youtube_service = YouTubeSearchService()
 reddit_service = RedditSearchService()
 scholar_service = ScholarSearchService()
 autocomplete_service = AutocompleteService()
+federated_service = FederatedSearchService(
+    google_service, youtube_service, reddit_service, scholar_service
+)
 
 # Initialize AI service
 ai_service = AIService()
 
+prefetcher = Prefetcher()
+enrichment_queue = EnrichmentQueue()
+
+SEARCH_TYPES = ("all", "images", "videos", "discussions", "papers", "other")
+search_seconds = metrics.histogram("neuraseek_search_seconds", "/search latency by result type", ("type",))
+search_errors = metrics.counter("neuraseek_search_errors_total", "/search requests that failed", ("type",))
+search_seconds_by_type = {type: search_seconds.labels(type) for type in SEARCH_TYPES}
+search_errors_by_type = {type: search_errors.labels(type) for type in SEARCH_TYPES}
+
+def _by_name(stats: dict, label: str, key: str, scale: float = 1) -> list:
+    return [
+        (((label, name),), values[key] * scale)
+        for name, values in stats.items() if values.get(key) is not None
+    ]
+
+@metrics.collector
+def component_metrics():
+    # Built from the same stats() as /stats, so only computed when scraped
+    caches = {"channels": channel_cache.stats(), "inference": inference_cache.stats()}
+    search_stats = search_cache.stats()
+    if "l1" in search_stats:
+        caches["search_l1"], caches["search_l2"] = search_stats["l1"], search_stats["l2"]
+    else:
+        caches["search"] = search_stats
+    yield "neuraseek_cache_hits_total", "counter", "Cache lookups that found an entry", _by_name(caches, "cache", "hits")
+    yield "neuraseek_cache_misses_total", "counter", "Cache lookups that found nothing", _by_name(caches, "cache", "misses")
+    yield "neuraseek_cache_hit_ratio", "gauge", "Share of cache lookups that found an entry", _by_name(caches, "cache", "hit_ratio")
+    yield "neuraseek_cache_entries", "gauge", "Entries held per cache", _by_name(caches, "cache", "entries")
+
+    lookups = []
+    for name, policy in cache_policies.items():
+        for result in ("fresh_hits", "stale_hits", "misses"):
+            lookups.append(((("function", name), ("result", result)), getattr(policy, result)))
+    yield "neuraseek_search_cache_lookups_total", "counter", "Cached search lookups by function and result", lookups
+
+    upstream_stats = {name: upstream.stats() for name, upstream in upstreams.items()}
+    yield "neuraseek_upstream_calls_total", "counter", "Upstream call attempts", _by_name(upstream_stats, "upstream", "calls")
+    yield "neuraseek_upstream_failures_total", "counter", "Upstream attempts that failed", _by_name(upstream_stats, "upstream", "failures")
+    yield "neuraseek_upstream_timeouts_total", "counter", "Upstream attempts that timed out", _by_name(upstream_stats, "upstream", "timeouts")
+    yield "neuraseek_upstream_retries_total", "counter", "Upstream attempts that were retries", _by_name(upstream_stats, "upstream", "retries")
+    yield "neuraseek_upstream_timeout_seconds", "gauge", "Current adaptive upstream timeout", _by_name(upstream_stats, "upstream", "timeout_ms", 0.001)
+    yield "neuraseek_circuit_rejected_total", "counter", "Calls rejected by an open circuit", _by_name(upstream_stats, "upstream", "rejected")
+    yield "neuraseek_circuit_state", "gauge", "1 for the circuit breaker's current state", [
+        ((("upstream", name), ("state", state)), int(values["state"] == state))
+        for name, values in upstream_stats.items() for state in ("closed", "open", "half_open")
+    ]
+
+    quota_stats = quota_scheduler.stats()
+    yield "neuraseek_quota_limit", "gauge", "Quota units per period", _by_name(quota_stats, "provider", "limit")
+    yield "neuraseek_quota_used", "gauge", "Quota units spent in the current period", _by_name(quota_stats, "provider", "used")
+    yield "neuraseek_quota_bucket_tokens", "gauge", "Quota units available for a burst", _by_name(quota_stats, "provider", "bucket_tokens")
+    yield "neuraseek_quota_denied_total", "counter", "Calls denied by the quota scheduler", [
+        ((("provider", provider), ("priority", priority)), denied)
+        for provider, values in quota_stats.items() for priority, denied in values["denied"].items()
+    ]
+
+    enrichment = enrichment_queue.stats()
+    yield "neuraseek_enrichment_jobs", "gauge", "Enrichment jobs by state", [
+        ((("state", state),), enrichment[state]) for state in ("queued", "running")
+    ]
+    yield "neuraseek_enrichment_rejected_total", "counter", "Enrichment jobs rejected by a full queue", [((), enrichment["rejected"])]
+    yield "neuraseek_http_open_connections", "gauge", "Open connections in the shared HTTP pool", [((), http_client.stats()["open_connections"])]
+
+def preload_clients():
+    # scholarly and asyncpraw take about a second to import together and are
+    # only imported on first use; this pays that in a worker thread after boot
+    try:
+        import asyncpraw
+        from scholarly import scholarly
+    except Exception as e:
+        print(f"Client preload error: {e}")
+
+@router.on_event("startup")
+async def open_http_pool():
+    await http_client.start()
+    enrichment_queue.start()
+    autocomplete_service.load_index()
+    if settings.PRELOAD_CLIENTS:
+        asyncio.get_running_loop().run_in_executor(None, preload_clients)
+
+@router.on_event("shutdown")
+async def close_http_pool():
+    autocomplete_service.save_index()
+    await enrichment_queue.stop()
+    await ai_service.close()
+    await http_client.close()
+    await search_cache.close()
+
+async def fetch_page(
+    type: str,
+    q: str,
+    page: int,
+    page_size: int,
+    page_token: Optional[str]
+):
+    next_token = None
+    sources = None
+    if type == "all":
+        # Fan out to every source and return whatever arrives before its deadline
+        results, total, has_more, next_token, sources = await federated_service.search(
+            q, page=page, page_size=page_size, page_token=page_token
+        )
+    elif type == "images":
+        results, total = await google_service.search(
+            q, search_type="images", page=page, page_size=page_size
+        )
+        has_more = len(results) == page_size
+    elif type == "videos":
+        results, total, next_token = await youtube_service.search(
+            q, page_token=page_token, page_size=page_size
+        )
+        has_more = bool(next_token)
+    elif type == "discussions":
+        results, total, next_token = await reddit_service.search(
+            q, limit=page_size, page=page, cursor=page_token
+        )
+        has_more = bool(next_token)
+    elif type == "papers":
+        results, total, next_token = await scholar_service.search(
+            q, limit=page_size, page=page, cursor=page_token
+        )
+        has_more = bool(next_token)
+    else:
+        results, total = [], 0
+        has_more = False
+
+    return results, total, has_more, next_token, sources
+
+async def add_summary(type: str, results: List[SearchResult]) -> Optional[dict]:
+    # Generate intelligent summary for web results, papers, and discussions
+    if type not in ["all", "papers", "discussions"]:
+        return None
+    with span("summary"):
+        summary_data = await ai_service.generate_intelligent_summary(results)
+    if not summary_data:
+        return None
+
+    results[0].additional_info = results[0].additional_info or {}
+    results[0].additional_info["ai_summary"] = summary_data['summary']
+    results[0].additional_info["summary_sources"] = summary_data['sources']
+    return {
+        "result_id": results[0].id,
+        "ai_summary": summary_data['summary'],
+        "summary_sources": summary_data['sources']
+    }
+
+async def add_sentiment(type: str, results: List[SearchResult]) -> Optional[dict]:
+    # Enhanced sentiment analysis for discussions and papers
+    if type not in ["discussions", "papers"]:
+        return None
+    # Get both detailed and overall sentiment for the whole page
+    with span("sentiment"):
+        await ai_service.enrich_sentiment(results)
+
+    sentiments = {}
+    for result in results:
+        info = {
+            key: value for key, value in (result.additional_info or {}).items()
+            if key in ("sentiment", "overall_sentiment")
+        }
+        if info:
+            sentiments[result.id] = info
+    return sentiments or None
+
+async def run_enrichments(job: EnrichmentJob, type: str, results: List[SearchResult]):
+    # Each enrichment is published as soon as it is ready, summary and
+    # sentiment do not wait for each other
+    async def publish(event: str, enrichment):
+        data = await enrichment
+        if data:
+            await job.publish(event, data)
+
+    await asyncio.gather(
+        publish("summary", add_summary(type, results)),
+        publish("sentiment", add_sentiment(type, results))
+    )
+
 @router.get("/search", response_model=SearchResponse)
 async def search(
     q: str,
+    background_tasks: BackgroundTasks,
     type: str = "all",
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    page_token: Optional[str] = None
+    page_token: Optional[str] = None,
+    enrich: str = Query("inline", pattern="^(inline|deferred)$")
 ):
+    started = time.perf_counter()
+    metric_type = type if type in SEARCH_TYPES else "other"
+    prefetcher.request_started(prefetcher.request_key(type, q, page, page_size, page_token))
+    if page == 1:
+        autocomplete_service.record_query(q)
     try:
-        if type == "all":
-            results, total = await google_service.search(q, page=page, page_size=page_size)
-            results = [r for r in results if r.type == "web"]
-            has_more = len(results) == page_size
-        elif type == "images":
-            results, total = await google_service.search(
-                q, search_type="images", page=page, page_size=page_size
-            )
-            has_more = len(results) == page_size
-        elif type == "videos":
-            results, total, next_token = await youtube_service.search(
-                q, page_token=page_token, page_size=page_size
+        results, total, has_more, next_token, sources = await fetch_page(
+            type, q, page, page_size, page_token
+        )
+
+        enrichment_id = None
+        if results and type in ["all", "papers", "discussions"]:
+            if enrich == "deferred":
+                # Results go out now; the job works on copies so it never
+                # touches objects being serialized or held by the search cache
+                copies = [result.model_copy(deep=True) for result in results]
+                job = enrichment_queue.submit(lambda job: run_enrichments(job, type, copies))
+                enrichment_id = job.id if job else None
+            else:
+                await asyncio.gather(add_summary(type, results), add_sentiment(type, results))
+
+        if has_more:
+            # Warm the cache with the page infinite scroll will ask for next
+            next_page = page + 1
+            background_tasks.add_task(
+                prefetcher.schedule,
+                prefetcher.request_key(type, q, next_page, page_size, next_token),
+                lambda: fetch_page(type, q, next_page, page_size, next_token)
             )
-            has_more = bool(next_token)
-        elif type == "discussions":
-            results, total = await reddit_service.search(q, limit=page_size, page=page)
-            has_more = len(results) == page_size
-        elif type == "papers":
-            results, total = await scholar_service.search(q, limit=page_size, page=page)
-            has_more = len(results) == page_size
-        else:
-            results, total = [], 0
-            has_more = False
-
-        if results:
-            # Generate intelligent summary for web results, papers, and discussions
-            if type in ["all", "papers", "discussions"]:
-                summary_data = await ai_service.generate_intelligent_summary(results)
-                if summary_data:
-                    results[0].additional_info = results[0].additional_info or {}
-                    results[0].additional_info["ai_summary"] = summary_data['summary']
-                    results[0].additional_info["summary_sources"] = summary_data['sources']
-
-            # Enhanced sentiment analysis for discussions and papers
-            if type in ["discussions", "papers"]:
-                for result in results:
-                    if result.description:
-                        # Get both detailed and overall sentiment
-                        sentiment = await ai_service.analyze_sentiment(result.description)
-                        overall_sentiment = await ai_service.analyze_overall_sentiment(result.description)
-                        
-                        if sentiment or overall_sentiment:
-                            result.additional_info = result.additional_info or {}
-                            if sentiment:
-                                result.additional_info["sentiment"] = sentiment
-                            if overall_sentiment:
-                                result.additional_info["overall_sentiment"] = overall_sentiment
-
-        return SearchResponse(
+
+        response = SearchResponse(
             results=results,
             total_results=total,
-            next_page_token=next_token if type == "videos" else None,
-            has_more=has_more
+            next_page_token=next_token,
+            has_more=has_more,
+            sources=sources,
+            enrichment_id=enrichment_id
         )
     except Exception as e:
         print(f"Search Error: {e}")
-        return SearchResponse(results=[], total_results=0, has_more=False)
+        search_errors_by_type[metric_type].inc()
+        response = SearchResponse(results=[], total_results=0, has_more=False)
+    finally:
+        prefetcher.request_finished()
+
+    # Serialized here rather than by FastAPI so it shows up as its own stage;
+    # the model was just built, validating it again is wasted work
+    with span("serialize"):
+        body = response.model_dump_json()
+    search_seconds_by_type[metric_type].observe(time.perf_counter() - started)
+    return Response(content=body, media_type="application/json")
+
+@router.get("/enrichments/{enrichment_id}")
+async def get_enrichments(enrichment_id: str):
+    job = enrichment_queue.get(enrichment_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired enrichment id")
+    return job.snapshot()
+
+@router.get("/enrichments/{enrichment_id}/events")
+async def stream_enrichments(enrichment_id: str):
+    # Server-Sent Events: one event per finished enrichment, then "done"
+    job = enrichment_queue.get(enrichment_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired enrichment id")
+
+    async def events():
+        async for event, data in job.stream():
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        yield f"event: done\ndata: {json.dumps({'status': job.status})}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/suggestions")
-async def get_suggestions(q: str):
-    return await autocomplete_service.get_suggestions(q)
+async def get_suggestions(q: str, client: Optional[str] = None):
+    # Browsers pass a per-tab id. Without one nothing is debounced: behind a
+    # proxy every caller shares an address and would supersede the others.
+    return await autocomplete_service.get_suggestions(q, client=client or None)
+
+@router.get("/metrics")
+async def get_metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@router.get("/stats")
+async def get_stats():
+    return {
+        "http": http_client.stats(),
+        "upstreams": {name: upstream.stats() for name, upstream in upstreams.items()},
+        "quota": quota_scheduler.stats(),
+        "cache": {
+            "search": search_cache.stats(),
+            "channels": channel_cache.stats(),
+            "inference": inference_cache.stats(),
+            "policies": {name: policy.stats() for name, policy in cache_policies.items()}
+        },
+        "single_flight": {
+            "search": search_flight.stats(),
+            "ai": ai_service.flight.stats()
+        },
+        "prefetch": prefetcher.stats(),
+        "enrichment": enrichment_queue.stats(),
+        "inference": {
+            **ai_service.backend.stats(),
+            "batching": ai_service.batching_stats()
+        },
+        "suggestions": autocomplete_service.stats()
+    }
@@ -1,3 +1,4 @@
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -10,6 +11,75 @@ class Settings(BaseSettings):
     CORS_ORIGINS: str = "http://localhost:5173,https://neuraseekng.vercel.app,https://neuraseekng-backend.up.railway.app,*"
     SERPAPI_KEY: str
     HUGGINGFACE_API_KEY: str
+    GOOGLE_API_BASE_URL: str = "https://www.googleapis.com"
+    SERPAPI_URL: str = "https://serpapi.com/search"
+    HUGGINGFACE_API_URL: str = "https://api-inference.huggingface.co/models"
+    REDDIT_URL: str = "https://www.reddit.com"
+    REDDIT_OAUTH_URL: str = "https://oauth.reddit.com"
+    UPSTREAM_TIMEOUT: float = 10.0
+    # Ceilings for the adaptive per-source timeouts, UPSTREAM_TIMEOUT otherwise
+    UPSTREAM_MAX_TIMEOUTS: Dict[str, float] = {"scholar": 20.0, "huggingface": 30.0}
+    UPSTREAM_MIN_TIMEOUT: float = 0.5
+    UPSTREAM_TIMEOUT_MULTIPLIER: float = 2.0  # Times the observed p99
+    UPSTREAM_MAX_RETRIES: int = 2
+    UPSTREAM_RETRY_BACKOFF: float = 0.2
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RESET_TIMEOUT: float = 30.0
+    # Units per period in seconds; providers not listed are not metered
+    QUOTA_LIMITS: Dict[str, List[float]] = {
+        "google": [10000, 86400],
+        "youtube": [10000, 86400],
+        "serpapi": [1000, 86400],
+        "reddit": [100, 60],
+        # Inference API requests; a batched call is one request
+        "huggingface": [1000, 3600]
+    }
+    QUOTA_COSTS: Dict[str, int] = {"youtube.search": 100}  # provider.call_type, 1 otherwise
+    QUOTA_BURST: float = 0.1  # Share of a period's quota that may be spent at once
+    # Share of the budget held back from lower priorities
+    QUOTA_PRIORITY_RESERVES: Dict[str, float] = {"core": 0.0, "enrichment": 0.2, "speculative": 0.5}
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_POOL_SIZE: int = 100
+    HTTP_POOL_SIZE_PER_HOST: int = 20
+    HTTP_KEEPALIVE_TIMEOUT: float = 30.0
+    HTTP_DNS_CACHE_TTL: int = 300
+    GOOGLE_MAX_PARALLEL_CHUNKS: int = 5
+    FEDERATED_DEADLINES: Dict[str, float] = {"web": 2.0, "videos": 2.5, "discussions": 2.5, "papers": 3.0}
+    FEDERATED_DEFAULT_DEADLINE: float = 2.5
+    PREFETCH_ENABLED: bool = False
+    PREFETCH_MAX_IN_FLIGHT: int = 8
+    PREFETCH_MAX_ACTIVE_REQUESTS: int = 32
+    PREFETCH_TTL: float = 300
+    SCHOLAR_SESSION_TTL: float = 900
+    SCHOLAR_MAX_SESSIONS: int = 256
+    PRELOAD_CLIENTS: bool = True  # Import scholarly and asyncpraw in the background after startup
+    SUGGESTION_INDEX_PATH: str = "suggestion_index.json"
+    SUGGESTION_INDEX_MAX_ENTRIES: int = 200000
+    SUGGESTION_HALF_LIFE: float = 7 * 86400
+    SUGGESTION_DEBOUNCE_WINDOW: float = 0.15
+    AI_BATCH_SIZE: int = 16
+    AI_BATCH_WINDOW: float = 0.005  # How long inputs wait for others to share a call
+    AI_MAX_CONCURRENCY: int = 4
+    INFERENCE_BACKEND: str = "remote"  # remote or local
+    INFERENCE_WORKERS: int = 2
+    INFERENCE_LOCAL_BATCH_SIZE: int = 64
+    ENRICHMENT_WORKERS: int = 4
+    ENRICHMENT_QUEUE_SIZE: int = 64
+    ENRICHMENT_TIMEOUT: float = 60.0
+    ENRICHMENT_JOB_TTL: float = 300
+    CACHE_BACKEND: str = "memory"  # memory, sqlite or redis
+    CACHE_SQLITE_PATH: str = "neuraseek_cache.sqlite3"
+    CACHE_SQLITE_MAX_ENTRIES: int = 100000
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_L1_TTL: float = 30  # In-process tier over a shared backend, 0 disables it
+    CACHE_MAX_ENTRIES: int = 2048
+    CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    CHANNEL_CACHE_MAX_ENTRIES: int = 10000
+    CHANNEL_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    AI_CACHE_TTL: float = 30 * 86400
+    AI_CACHE_MAX_ENTRIES: int = 50000
+    AI_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    SERVER_TIMING: bool = False  # Per-request stage timings in a Server-Timing header
 
     class Config:
         env_file = ".env"
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 class SearchResult(BaseModel):
     id: str
@@ -17,4 +17,9 @@ class SearchResponse(BaseModel):
     results: List[SearchResult]
     total_results: int
     next_page_token: Optional[str] = None
-    has_more: bool = False
\ No newline at end of file
+    has_more: bool = False
+    # Per-source status for federated searches: ok, empty, timeout or error
+    sources: Optional[Dict[str, str]] = None
+    # Set with enrich=deferred: AI summary and sentiment arrive from
+    # /enrichments/{enrichment_id} instead of being part of this response
+    enrichment_id: Optional[str] = None
\ No newline at end of file
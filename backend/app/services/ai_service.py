@@ -1,11 +1,19 @@
 from typing import Dict, List, Optional
+import asyncio
 import aiohttp
 from ..config import settings
+from ..utils.http import http_client
+from ..utils.quota import quota_scheduler
+from ..utils.resilience import LocalRejection
+from ..utils.batching import MicroBatcher
+from ..utils.cache import SingleFlight, inference_cache
+from .inference import InferenceBackend, LocalInferenceBackend, RemoteInferenceBackend
+import hashlib
 import json
 
 class AIService:
     def __init__(self):
-        self.base_url = "https://api-inference.huggingface.co/models"
+        self.base_url = settings.HUGGINGFACE_API_URL
         self.headers = {
             "Authorization": f"Bearer {settings.HUGGINGFACE_API_KEY}",
             "Content-Type": "application/json"
@@ -15,6 +23,15 @@ class AIService:
         self.summarizer_model = "facebook/bart-large-cnn"
         self.sentiment_model = "SamLowe/roberta-base-go_emotions"
         self.overall_sentiment_model = "cardiffnlp/twitter-roberta-base-sentiment"
+        self.overall_sentiment_labels = ['Negative', 'Neutral', 'Positive']
+
+        # Identical in-flight inference requests share one upstream call
+        self.flight = SingleFlight()
+
+        # Sentiment models run on this backend, summaries always go remote
+        self.backend = self._create_backend(settings.INFERENCE_BACKEND)
+        # Per model; merges inputs from concurrent requests into shared calls
+        self.batchers: Dict[str, MicroBatcher] = {}
         
         # Trusted domains for summaries
         self.trusted_domains = [
@@ -30,27 +47,83 @@ class AIService:
             'un.org'
         ]
 
+    def _create_backend(self, name: str) -> InferenceBackend:
+        if name == "local":
+            return LocalInferenceBackend(
+                tasks={
+                    self.sentiment_model: "emotion",
+                    self.overall_sentiment_model: "polarity"
+                },
+                workers=settings.INFERENCE_WORKERS,
+                batch_size=settings.INFERENCE_LOCAL_BATCH_SIZE
+            )
+        if name != "remote":
+            raise ValueError(f"Unknown INFERENCE_BACKEND: {name}")
+        # Caps batched inference so one page cannot flood the inference API
+        return RemoteInferenceBackend(
+            self._make_request,
+            batch_size=settings.AI_BATCH_SIZE,
+            max_concurrency=settings.AI_MAX_CONCURRENCY
+        )
+
+    def _batcher(self, model: str) -> MicroBatcher:
+        batcher = self.batchers.get(model)
+        if batcher is None:
+            batcher = MicroBatcher(
+                lambda texts: self.backend.infer(model, texts),
+                max_batch_size=settings.AI_BATCH_SIZE,
+                max_wait=settings.AI_BATCH_WINDOW,
+                max_in_flight=settings.AI_MAX_CONCURRENCY
+            )
+            self.batchers[model] = batcher
+        return batcher
+
+    async def close(self):
+        await self.backend.close()
+
+    def batching_stats(self) -> dict:
+        return {model: batcher.stats() for model, batcher in self.batchers.items()}
+
     def is_trusted_source(self, url: str) -> bool:
         return any(domain in url.lower() for domain in self.trusted_domains)
 
     async def _make_request(self, model: str, payload: Dict) -> Dict:
+        key = hashlib.blake2b(
+            json.dumps([model, payload], sort_keys=True).encode(),
+            digest_size=16
+        ).hexdigest()
+        return await self.flight.do(key, lambda: self._post(model, payload))
+
+    async def _post(self, model: str, payload: Dict) -> Dict:
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.base_url}/{model}",
-                    headers=self.headers,
-                    json=payload,
-                    raise_for_status=True
-                ) as response:
-                    if response.content_type == 'application/json':
-                        return await response.json()
-                    text_response = await response.text()
-                    return json.loads(text_response)
-                    
-        except aiohttp.ClientError as e:
-            print(f"API request error: {str(e)}")
+            # Inference has no side effects, so retrying a POST is safe; 503s
+            # while a model is loading are the common case
+            return await quota_scheduler.call(
+                "huggingface",
+                "inference",
+                lambda: self._send(model, payload),
+                priority="enrichment",
+                retry=True
+            )
+        except LocalRejection as e:
+            print(f"API request skipped: {e}")
+            return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"API request error: {str(e) or type(e).__name__}")
             return None
 
+    async def _send(self, model: str, payload: Dict) -> Dict:
+        async with http_client.session.post(
+            f"{self.base_url}/{model}",
+            headers=self.headers,
+            json=payload,
+            raise_for_status=True
+        ) as response:
+            if response.content_type == 'application/json':
+                return await response.json()
+            text_response = await response.text()
+            return json.loads(text_response)
+
     async def generate_intelligent_summary(self, results: List[dict]) -> Optional[str]:
         try:
             # Filter and sort results by source reliability
@@ -81,88 +154,142 @@ class AIService:
             if not texts:
                 return None
             
-            combined_text = " ".join(texts)
+            combined_text = inference_cache.normalize_text(" ".join(texts))
             if len(combined_text) > 4096:
                 combined_text = combined_text[:4096] + "..."
             
-            response = await self._make_request(
-                self.summarizer_model,
-                {
-                    "inputs": combined_text,
-                    "parameters": {
-                        "max_length": 200,
-                        "min_length": 50,
-                        "do_sample": False
+            parameters = {
+                "max_length": 200,
+                "min_length": 50,
+                "do_sample": False
+            }
+            summary = inference_cache.get(self.summarizer_model, combined_text, parameters)
+            if summary is None:
+                response = await self._make_request(
+                    self.summarizer_model,
+                    {
+                        "inputs": combined_text,
+                        "parameters": parameters
                     }
-                }
-            )
-            
-            if response and isinstance(response, list) and len(response) > 0:
+                )
+                if not (response and isinstance(response, list) and len(response) > 0):
+                    return None
                 summary = response[0].get('summary_text', '')
-                sources = [result.source_name for result in selected_results]
-                return {
-                    'summary': summary,
-                    'sources': sources
-                }
-            return None
+                if summary:
+                    inference_cache.set(self.summarizer_model, combined_text, summary, parameters)
+
+            sources = [result.source_name for result in selected_results]
+            return {
+                'summary': summary,
+                'sources': sources
+            }
             
         except Exception as e:
             print(f"Intelligent summary generation error: {str(e)}")
             return None
 
+    async def _infer_batch(self, model: str, texts: List[str]) -> List[Optional[list]]:
+        # Only texts this model has not scored before are inferred, each once
+        cache_model = self.backend.cache_model(model)
+        texts = [inference_cache.normalize_text(text) for text in texts]
+        known = {text: inference_cache.get(cache_model, text) for text in dict.fromkeys(texts)}
+        missing = [text for text, prediction in known.items() if prediction is None]
+
+        predictions = await self._batcher(model).submit(missing) if missing else []
+        for text, prediction in zip(missing, predictions):
+            known[text] = prediction
+            if prediction is not None:
+                inference_cache.set(cache_model, text, prediction)
+
+        return [known[text] for text in texts]
+
+    def _parse_sentiment(self, prediction) -> Optional[Dict]:
+        if not prediction:
+            return None
+
+        # Get top 3 emotions
+        emotions = sorted(
+            prediction,
+            key=lambda x: x['score'],
+            reverse=True
+        )[:3]
+
+        return {
+            "emotions": [
+                {"emotion": e['label'], "score": e['score']}
+                for e in emotions
+            ],
+            "dominant_emotion": emotions[0]['label']
+        }
+
+    def _parse_overall_sentiment(self, prediction) -> Optional[Dict]:
+        if not prediction:
+            return None
+
+        # Map sentiment scores, the model reports LABEL_0..LABEL_2 sorted by score
+        sentiment_scores = {}
+        for index, entry in enumerate(prediction):
+            if isinstance(entry, dict):
+                label_index = int(entry['label'].rsplit('_', 1)[-1])
+                sentiment_scores[self.overall_sentiment_labels[label_index]] = entry['score']
+            else:
+                sentiment_scores[self.overall_sentiment_labels[index]] = entry
+
+        # Get dominant sentiment
+        dominant = max(sentiment_scores.items(), key=lambda x: x[1])
+
+        return {
+            "scores": sentiment_scores,
+            "dominant": dominant[0],
+            "confidence": dominant[1]
+        }
+
     async def analyze_sentiment(self, text: str) -> Optional[Dict]:
         try:
-            response = await self._make_request(
-                self.sentiment_model,
-                {"inputs": text}
-            )
-            
-            if isinstance(response, list) and len(response) > 0:
-                # Get top 3 emotions
-                emotions = sorted(
-                    response[0], 
-                    key=lambda x: x['score'], 
-                    reverse=True
-                )[:3]
-                
-                return {
-                    "emotions": [
-                        {"emotion": e['label'], "score": e['score']} 
-                        for e in emotions
-                    ],
-                    "dominant_emotion": emotions[0]['label']
-                }
-            return None
-            
+            predictions = await self._infer_batch(self.sentiment_model, [text])
+            return self._parse_sentiment(predictions[0])
+
         except Exception as e:
             print(f"Sentiment analysis error: {e}")
             return None
 
     async def analyze_overall_sentiment(self, text: str) -> Optional[Dict]:
         try:
-            response = await self._make_request(
-                self.overall_sentiment_model,
-                {"inputs": text}
-            )
-            
-            if response and isinstance(response, list) and len(response) > 0:
-                # Map sentiment scores
-                sentiments = response[0]
-                labels = ['Negative', 'Neutral', 'Positive']
-                sentiment_scores = {
-                    label: score for label, score in zip(labels, sentiments)
-                }
-                
-                # Get dominant sentiment
-                dominant = max(sentiment_scores.items(), key=lambda x: x[1])
-                
-                return {
-                    "scores": sentiment_scores,
-                    "dominant": dominant[0],
-                    "confidence": dominant[1]
-                }
-            return None
-            
+            predictions = await self._infer_batch(self.overall_sentiment_model, [text])
+            return self._parse_overall_sentiment(predictions[0])
+
         except Exception as e:
             print(f"Overall sentiment analysis error: {str(e)}")
-            return None
\ No newline at end of file
+            return None
+
+    async def enrich_sentiment(self, results: List) -> None:
+        # Score every description with both models at once and attach the
+        # results to the SearchResult they came from
+        targets = [result for result in results if result.description]
+        if not targets:
+            return
+
+        texts = [result.description for result in targets]
+        try:
+            sentiments, overall_sentiments = await asyncio.gather(
+                self._infer_batch(self.sentiment_model, texts),
+                self._infer_batch(self.overall_sentiment_model, texts)
+            )
+        except Exception as e:
+            print(f"Sentiment enrichment error: {e}")
+            return
+
+        for result, sentiment, overall in zip(targets, sentiments, overall_sentiments):
+            try:
+                sentiment = self._parse_sentiment(sentiment)
+                overall_sentiment = self._parse_overall_sentiment(overall)
+            except Exception as e:
+                print(f"Sentiment analysis error: {e}")
+                continue
+
+            if sentiment or overall_sentiment:
+                result.additional_info = result.additional_info or {}
+                if sentiment:
+                    result.additional_info["sentiment"] = sentiment
+                if overall_sentiment:
+                    result.additional_info["overall_sentiment"] = overall_sentiment
@@ -1,14 +1,81 @@
-from ..utils.cache import cached_search
-import aiohttp
+from typing import Hashable, List, Optional
+from ..utils.cache import CachePolicy, cached_search, normalize_query
+from ..utils.cache_backends import LRUCache
+from ..utils.debounce import Debouncer
+from ..utils.http import http_client
+from ..utils.quota import quota_scheduler
+from ..utils.prefix_index import PrefixIndex
 from ..config import settings
 
 class AutocompleteService:
+    MAX_SUGGESTIONS = 5
+
     def __init__(self):
         self.api_key = settings.SERPAPI_KEY
-        self.base_url = "https://serpapi.com/search"
+        self.base_url = settings.SERPAPI_URL
+
+        # Filled from SerpAPI responses and submitted searches; answers warm
+        # prefixes locally without a SerpAPI round trip
+        self.index = PrefixIndex(
+            half_life=settings.SUGGESTION_HALF_LIFE,
+            max_entries=settings.SUGGESTION_INDEX_MAX_ENTRIES,
+            top_k=self.MAX_SUGGESTIONS
+        )
+        # Full upstream result per normalized query, for answering longer prefixes
+        self.upstream_results = LRUCache(ttl_seconds=3600, max_entries=10000)
+        self.debouncer = Debouncer(settings.SUGGESTION_DEBOUNCE_WINDOW)
+
+        self.local_hits = 0
+        self.reused = 0
+        self.upstream_lookups = 0
+        self.serpapi_calls = 0
+
+    def record_query(self, query: str):
+        # Queries people actually search for outweigh upstream suggestions
+        self.index.add(query, weight=3.0)
+
+    def _reuse(self, key: str) -> Optional[List[str]]:
+        # Answers "pyth" from the result for "pyt" (or "py", ...) when that
+        # result still has enough matches, or was short enough to be complete
+        for end in range(len(key), 0, -1):
+            cached = self.upstream_results.get(key[:end])
+            if not cached:
+                continue
+            matches = [s for s in cached if normalize_query(s).startswith(key)]
+            if len(matches) >= self.MAX_SUGGESTIONS or len(cached) < self.MAX_SUGGESTIONS:
+                return matches[:self.MAX_SUGGESTIONS]
+        return None
+
+    async def get_suggestions(self, query: str, client: Optional[Hashable] = None):
+        local = self.index.lookup(query)
+        if len(local) >= self.MAX_SUGGESTIONS:
+            self.local_hits += 1
+            return local
+
+        key = normalize_query(query)
+        reused = self._reuse(key)
+        if reused is not None:
+            self.reused += 1
+            return reused
 
-    @cached_search
-    async def get_suggestions(self, query: str):
+        # While someone types, only the last prefix in the window goes upstream;
+        # earlier ones get what is known locally
+        if not await self.debouncer.wait(client):
+            return local
+
+        self.upstream_lookups += 1
+        suggestions = await self.fetch_suggestions(query)
+        if suggestions:
+            self.upstream_results.set(key, suggestions)
+        for position, suggestion in enumerate(suggestions):
+            self.index.add(suggestion, weight=1.0 / (position + 1))
+        return suggestions[:self.MAX_SUGGESTIONS]
+
+    @cached_search(
+        key_params=("query",),
+        policy=CachePolicy(ttl=3600, stale_ttl=86400, empty_ttl=60)
+    )
+    async def fetch_suggestions(self, query: str):
         try:
             params = {
                 "engine": "google_autocomplete",
@@ -17,15 +84,37 @@ class AutocompleteService:
                 "gl": "in",
                 "hl": "en"
             }
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.base_url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        suggestions = data.get("suggestions", [])
-                        # Limit to 5 suggestions
-                        return [item.get("value", "") for item in suggestions][:5]
-                    return []
+            return await quota_scheduler.call("serpapi", "autocomplete", lambda: self._get(params), retry=True)
         except Exception as e:
             print(f"Error fetching suggestions: {e}")
-            return [] 
\ No newline at end of file
+            return []
+
+    async def _get(self, params: dict) -> List[str]:
+        self.serpapi_calls += 1
+        async with http_client.session.get(self.base_url, params=params, raise_for_status=True) as response:
+            data = await response.json()
+            suggestions = data.get("suggestions", [])
+            # Kept whole so longer prefixes can be answered from it
+            return [item.get("value", "") for item in suggestions if item.get("value")]
+
+    def load_index(self):
+        if self.index.load(settings.SUGGESTION_INDEX_PATH):
+            print(f"Loaded {len(self.index)} suggestions from {settings.SUGGESTION_INDEX_PATH}")
+
+    def save_index(self):
+        try:
+            self.index.snapshot(settings.SUGGESTION_INDEX_PATH)
+        except OSError as e:
+            print(f"Could not save suggestion index: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.local_hits + self.reused + self.upstream_lookups
+        return {
+            "local_hits": self.local_hits,
+            "reused": self.reused,
+            "upstream_lookups": self.upstream_lookups,
+            "serpapi_calls": self.serpapi_calls,
+            "local_hit_ratio": (self.local_hits + self.reused) / lookups if lookups else 0.0,
+            "debounce": self.debouncer.stats(),
+            "index": self.index.stats()
+        }
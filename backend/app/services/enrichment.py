@@ -0,0 +1,120 @@
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+import asyncio
+import uuid
+from ..config import settings
+from ..utils.cache_backends import LRUCache
+
+class EnrichmentJob:
+    # Events produced for one deferred /search response, in order. Readers
+    # replay what was already published and then wait for the rest.
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = "queued"
+        self.events: List[Tuple[str, Any]] = []
+        self._changed = asyncio.Condition()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "failed")
+
+    async def publish(self, event: str, data: Any):
+        async with self._changed:
+            self.events.append((event, data))
+            self._changed.notify_all()
+
+    async def finish(self, status: str):
+        async with self._changed:
+            self.status = status
+            self._changed.notify_all()
+
+    async def stream(self) -> AsyncIterator[Tuple[str, Any]]:
+        sent = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: len(self.events) > sent or self.done)
+                pending = self.events[sent:]
+                done = self.done
+            for event in pending:
+                yield event
+            sent += len(pending)
+            if done and sent == len(self.events):
+                return
+
+    def snapshot(self) -> dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "events": [{"event": event, "data": data} for event, data in self.events]
+        }
+
+class EnrichmentQueue:
+    # Bounded queue of enrichment jobs (AI summaries, sentiment) drained by a
+    # fixed set of workers. When the queue is full new jobs are rejected and
+    # the response simply goes out without enrichments.
+    def __init__(self):
+        self.workers = settings.ENRICHMENT_WORKERS
+        self.timeout = settings.ENRICHMENT_TIMEOUT
+        self._queue = asyncio.Queue(maxsize=settings.ENRICHMENT_QUEUE_SIZE)
+        self._jobs = LRUCache(ttl_seconds=settings.ENRICHMENT_JOB_TTL, max_entries=10000)
+        self._worker_tasks = []
+
+        self.running = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def start(self):
+        if not self._worker_tasks:
+            self._worker_tasks = [asyncio.ensure_future(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    def submit(self, work: Callable[[EnrichmentJob], Awaitable[None]]) -> Optional[EnrichmentJob]:
+        self.start()
+        job = EnrichmentJob()
+        try:
+            self._queue.put_nowait((job, work))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return None
+        self._jobs.set(job.id, job)
+        self.submitted += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[EnrichmentJob]:
+        return self._jobs.get(job_id)
+
+    async def _work(self):
+        while True:
+            job, work = await self._queue.get()
+            self.running += 1
+            job.status = "running"
+            try:
+                await asyncio.wait_for(work(job), self.timeout)
+            except Exception as e:
+                print(f"Enrichment job {job.id} failed: {e}")
+                self.failed += 1
+                await job.publish("error", {"message": "enrichment failed"})
+                await job.finish("failed")
+            else:
+                self.completed += 1
+                await job.finish("done")
+            finally:
+                self.running -= 1
+                self._queue.task_done()
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._worker_tasks),
+            "queued": self._queue.qsize(),
+            "running": self.running,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected
+        }
@@ -0,0 +1,144 @@
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import math
+import time
+from ..config import settings
+from ..models.search import SearchResult
+from ..utils.cursor import decode_cursor, encode_cursor
+from ..utils.metrics import metrics
+from .ranking import ResultRanker
+
+SOURCES = ("web", "videos", "discussions", "papers")
+
+source_seconds = metrics.histogram(
+    "neuraseek_source_seconds",
+    "Time until a federated source answered, failed or missed its deadline",
+    ("source",)
+)
+source_outcomes = metrics.counter(
+    "neuraseek_source_outcomes_total",
+    "Federated source outcomes: ok, empty, timeout or error",
+    ("source", "status")
+)
+
+class FederatedSearchService:
+    def __init__(self, google_service, youtube_service, reddit_service, scholar_service):
+        self.google_service = google_service
+        self.youtube_service = youtube_service
+        self.reddit_service = reddit_service
+        self.scholar_service = scholar_service
+        self.ranker = ResultRanker()
+
+        # Keeps fetches that missed their deadline referenced; they finish in
+        # the background and warm the cache for the next request
+        self._late_tasks = set()
+
+        # Looked up once here rather than per search
+        self.source_seconds = {source: source_seconds.labels(source) for source in SOURCES}
+        self.source_outcomes = {
+            (source, status): source_outcomes.labels(source, status)
+            for source in SOURCES for status in ("ok", "empty", "timeout", "error")
+        }
+
+    def _source_calls(
+        self,
+        query: str,
+        page: int,
+        limit: int,
+        cursors: Dict[str, str],
+        include_videos: bool
+    ) -> Dict:
+        # Reddit and Scholar continue from their own cursors when the client
+        # sent them back; page numbers are only the fallback. The raising
+        # variants let _run_source report failures as errors, not as empty.
+        calls = {
+            "web": lambda: self.google_service.search_or_raise(query, page=page, page_size=limit),
+            "discussions": lambda: self.reddit_service.search_or_raise(
+                query, limit=limit, page=page, cursor=cursors.get("discussions")
+            ),
+            "papers": lambda: self.scholar_service.search_or_raise(
+                query, limit=limit, page=page, cursor=cursors.get("papers")
+            )
+        }
+        if include_videos:
+            calls["videos"] = lambda: self.youtube_service.search_or_raise(
+                query, page_token=cursors.get("videos"), page_size=limit
+            )
+        return calls
+
+    async def _run_source(self, name: str, call, deadline: float) -> Tuple[str, Optional[tuple]]:
+        started = time.perf_counter()
+        task = asyncio.ensure_future(call())
+        try:
+            return "ok", await asyncio.wait_for(asyncio.shield(task), deadline)
+        except asyncio.TimeoutError:
+            self._late_tasks.add(task)
+            task.add_done_callback(self._late_finished)
+            return "timeout", None
+        except Exception as e:
+            print(f"Federated {name} search error: {e}")
+            return "error", None
+        finally:
+            self.source_seconds[name].observe(time.perf_counter() - started)
+
+    def _late_finished(self, task: asyncio.Future):
+        self._late_tasks.discard(task)
+        # Nobody awaits a late fetch any more, read its failure here
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Late federated search error: {task.exception()}")
+
+    async def search(
+        self,
+        query: str,
+        page: int = 1,
+        page_size: int = 20,
+        page_token: Optional[str] = None
+    ) -> Tuple[List[SearchResult], int, bool, Optional[str], Dict[str, str]]:
+        # page_token is an opaque cursor holding every source's own token.
+        # YouTube pages by token only, so it joins on the first page or when
+        # the cursor carries its token.
+        cursors = {
+            name: token for name, token in (decode_cursor(page_token) or {}).items()
+            if name in SOURCES and isinstance(token, str)
+        }
+        include_videos = page == 1 or "videos" in cursors
+
+        # Every source contributes a quarter of the page, even when videos sit
+        # out; page N of a source starts at (N - 1) * limit, so the share must
+        # not change between pages or results get skipped
+        limit = max(1, math.ceil(page_size / 4))
+        calls = self._source_calls(query, page, limit, cursors, include_videos)
+
+        names = list(calls)
+        outcomes = await asyncio.gather(*[
+            self._run_source(name, calls[name], settings.FEDERATED_DEADLINES.get(name, settings.FEDERATED_DEFAULT_DEADLINE))
+            for name in names
+        ])
+
+        per_source = {}
+        statuses = {}
+        total = 0
+        has_more = False
+        next_cursors = {}
+        for name, (status, response) in zip(names, outcomes):
+            if status != "ok":
+                statuses[name] = status
+                continue
+
+            results, source_total = response[0], response[1]
+            if len(response) > 2 and response[2]:
+                next_cursors[name] = response[2]
+            if name == "videos":
+                has_more = has_more or bool(response[2])
+            else:
+                has_more = has_more or len(results) == limit
+
+            statuses[name] = "ok" if results else "empty"
+            per_source[name] = results
+            total += source_total
+
+        for name, status in statuses.items():
+            self.source_outcomes[name, status].inc()
+
+        next_token = encode_cursor(next_cursors) if next_cursors else None
+        return self.ranker.merge(per_source, query), total, has_more, next_token, statuses
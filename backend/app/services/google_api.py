@@ -0,0 +1,37 @@
+from typing import Dict, Optional
+from ..config import settings
+from ..utils.http import http_client
+from ..utils.quota import quota_scheduler
+
+class GoogleApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+# Async REST client for Custom Search and YouTube Data v3. googleapiclient's
+# `.execute()` is synchronous and would block the event loop.
+class GoogleApiClient:
+    def __init__(self, base_path: str, api_key: str, provider: str):
+        self.base_url = f"{settings.GOOGLE_API_BASE_URL.rstrip('/')}/{base_path.strip('/')}"
+        self.api_key = api_key
+        self.provider = provider
+
+    async def get(self, resource: str = "", priority: Optional[str] = None, **params) -> Dict:
+        params["key"] = self.api_key
+        url = f"{self.base_url}/{resource}" if resource else self.base_url
+        # Quota is charged per resource; GETs are idempotent, safe to retry
+        return await quota_scheduler.call(
+            self.provider,
+            resource or "search",
+            lambda: self._get(url, params),
+            priority=priority,
+            retry=True
+        )
+
+    async def _get(self, url: str, params: Dict) -> Dict:
+        async with http_client.session.get(url, params=params) as response:
+            data = await response.json(content_type=None)
+            if response.status != 200:
+                error = data.get("error", {}) if isinstance(data, dict) else {}
+                raise GoogleApiError(response.status, error.get("message", response.reason))
+            return data
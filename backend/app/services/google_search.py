@@ -1,64 +1,128 @@
-from googleapiclient.discovery import build
+import asyncio
 from ..config import settings
 from ..models.search import SearchResult
-from ..utils.cache import cached_search
+from ..utils.cache import CachePolicy, cached_search
+from .google_api import GoogleApiClient
 
 class GoogleSearchService:
+    # The Custom Search API returns at most 10 items per call and nothing past
+    # the 100th result
+    CHUNK_SIZE = 10
+    MAX_RESULTS = 100
+
     def __init__(self):
-        self.service = build(
-            "customsearch", "v1",
-            developerKey=settings.GOOGLE_API_KEY
-        )
+        self.client = GoogleApiClient("customsearch/v1", settings.GOOGLE_API_KEY, "google")
+
+    @cached_search(
+        key_params=("query", "search_type", "offset"),
+        policy=CachePolicy(ttl=300, stale_ttl=900, empty_ttl=30)
+    )
+    async def fetch_chunk(self, query: str, search_type: str = None, offset: int = 0):
+        # One aligned 10-item chunk; cached on its own so pages of any size
+        # that overlap the same results reuse it
+        search_params = {
+            "q": query,
+            "cx": settings.GOOGLE_CX_ID,
+            "start": offset + 1,
+            "num": self.CHUNK_SIZE
+        }
+
+        if search_type == "images":
+            search_params["searchType"] = "image"
+
+        results = await self.client.get(**search_params)
+
+        chunk_results = []
+        for item in results.get("items", []):
+            favicon = f"https://www.google.com/s2/favicons?domain={item['link']}&sz=32"
+            source_name = item.get("displayLink", "").replace("www.", "")
+            
+            result = SearchResult(
+                id=item["link"],
+                title=item["title"],
+                description=item.get("snippet"),
+                url=item["link"],
+                thumbnail=item.get("pagemap", {}).get("cse_thumbnail", [{}])[0].get("src"),
+                type="image" if search_type == "images" else "web",
+                source_icon=favicon,
+                source_name=source_name
+            )
+            chunk_results.append(result)
+
+        return chunk_results, int(results.get("searchInformation", {}).get("totalResults", 0))
 
-    @cached_search
     async def search(self, query: str, search_type: str = None, page: int = 1, page_size: int = 20):
+        # Never raises: failures come back as an empty page. The federated
+        # search calls search_or_raise to tell them apart.
         try:
-            all_results = []
-            remaining = page_size
-            current_start = (page - 1) * page_size + 1
-            
-            while remaining > 0:
-                search_params = {
-                    "q": query,
-                    "cx": settings.GOOGLE_CX_ID,
-                    "start": current_start,
-                    "num": min(remaining, 10)  # Google API max is 10
-                }
-                
-                if search_type == "images":
-                    search_params["searchType"] = "image"
+            return await self.search_or_raise(query, search_type, page, page_size)
+        except Exception as e:
+            print(f"Google Search Error: {e}")
+            return [], 0
 
-                results = self.service.cse().list(**search_params).execute()
-                items = results.get("items", [])
-                
-                if not items:
+    async def search_or_raise(self, query: str, search_type: str = None, page: int = 1, page_size: int = 20):
+        # Not cached itself: pages are cut from cached chunks, and a page
+        # cache would keep serving (and re-storing as fresh) stale chunks
+        first = (page - 1) * page_size
+        last = min(first + page_size, self.MAX_RESULTS)
+        if first >= last:
+            return [], 0
+
+        # The chunk offsets are known up front, so fetch them concurrently
+        chunk_offsets = list(range(first - first % self.CHUNK_SIZE, last, self.CHUNK_SIZE))
+        semaphore = asyncio.Semaphore(settings.GOOGLE_MAX_PARALLEL_CHUNKS)
+        tasks = {}
+        # Where the upstream's results end, as far as any chunk has shown yet
+        end = last
+
+        def cut_off(new_end: int):
+            # Chunks past the end would only spend quota on empty pages: the
+            # queued ones are dropped before they start, running ones cancelled
+            nonlocal end
+            if new_end >= end:
+                return
+            end = new_end
+            for offset, task in tasks.items():
+                if offset >= end and task is not asyncio.current_task():
+                    task.cancel()
+
+        async def fetch(offset: int):
+            async with semaphore:
+                chunk_results, chunk_total = await self.fetch_chunk(query, search_type, offset)
+            received = offset + len(chunk_results)
+            # A short chunk means the upstream ran out; totalResults rules out later chunks too
+            if len(chunk_results) < self.CHUNK_SIZE:
+                cut_off(received)
+            if chunk_total:
+                cut_off(max(chunk_total, received))
+            return chunk_results, chunk_total
+
+        for offset in chunk_offsets:
+            task = asyncio.ensure_future(fetch(offset))
+            # Chunks nobody reads after a failure still finish, retrieve their errors
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+            tasks[offset] = task
+
+        all_results = []
+        total = 0
+        try:
+            for offset in chunk_offsets:
+                if offset >= end:
                     break
-                    
-                for item in items:
-                    favicon = f"https://www.google.com/s2/favicons?domain={item['link']}&sz=32"
-                    source_name = item.get("displayLink", "").replace("www.", "")
-                    
-                    result = SearchResult(
-                        id=item["link"],
-                        title=item["title"],
-                        description=item.get("snippet"),
-                        url=item["link"],
-                        thumbnail=item.get("pagemap", {}).get("cse_thumbnail", [{}])[0].get("src"),
-                        type="image" if search_type == "images" else "web",
-                        source_icon=favicon,
-                        source_name=source_name
-                    )
-                    all_results.append(result)
-                
-                remaining -= len(items)
-                current_start += len(items)
-                
-                # Break if we got fewer results than requested
-                if len(items) < min(remaining, 10):
+                try:
+                    chunk_results, chunk_total = await tasks[offset]
+                except asyncio.CancelledError:
+                    # Cut off by another chunk while waiting, not cancelled ourselves
+                    if tasks[offset].cancelled() and offset >= end:
+                        break
+                    raise
+                all_results.extend(chunk_results)
+                total = total or chunk_total
+                if len(chunk_results) < self.CHUNK_SIZE:
                     break
+        finally:
+            for task in tasks.values():
+                task.cancel()
 
-            return all_results, int(results["searchInformation"]["totalResults"])
-            
-        except Exception as e:
-            print(f"Google Search Error: {e}")
-            return [], 0 
\ No newline at end of file
+        window_start = first - chunk_offsets[0]
+        return all_results[window_start:window_start + (last - first)], total
@@ -0,0 +1,113 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Awaitable, Callable, Dict, List, Optional
+import asyncio
+import multiprocessing
+from . import sentiment_lexicon
+
+class InferenceBackend(ABC):
+    # Runs a classification model over a batch of texts and returns one
+    # prediction per text in the inference API format (a list of
+    # {"label", "score"}), or None where inference failed
+    name = "base"
+
+    @abstractmethod
+    async def infer(self, model: str, texts: List[str]) -> List[Optional[list]]:
+        ...
+
+    def cache_model(self, model: str) -> str:
+        # Name outputs are cached under; engines disagree, so never share entries
+        return f"{self.name}:{model}"
+
+    async def close(self):
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": self.name}
+
+class RemoteInferenceBackend(InferenceBackend):
+    # Hugging Face inference API; takes a list of inputs and returns one
+    # prediction per input
+    name = "remote"
+
+    def __init__(self, request: Callable[[str, Dict], Awaitable[Optional[list]]], batch_size: int, max_concurrency: int):
+        self.request = request
+        self.batch_size = batch_size
+        self.request_semaphore = asyncio.Semaphore(max_concurrency)
+
+    def cache_model(self, model: str) -> str:
+        return model
+
+    async def infer(self, model: str, texts: List[str]) -> List[Optional[list]]:
+        async def infer_chunk(chunk: List[str]) -> List[Optional[list]]:
+            async with self.request_semaphore:
+                response = await self.request(model, {"inputs": chunk})
+            if isinstance(response, list) and len(response) == len(chunk):
+                return response
+            return [None] * len(chunk)
+
+        chunks = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        predictions = await asyncio.gather(*[infer_chunk(chunk) for chunk in chunks])
+        return [prediction for chunk in predictions for prediction in chunk]
+
+class LocalInferenceBackend(InferenceBackend):
+    # CPU lexicon scorer in a process pool, so scoring never runs on the
+    # event loop and needs no network. Models without a local task get None.
+    name = "local"
+
+    def __init__(self, tasks: Dict[str, str], workers: int, batch_size: int):
+        self.tasks = tasks
+        self.workers = workers
+        self.batch_size = batch_size
+        self._pool = None
+        self.batches = 0
+        self.texts = 0
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Forking a process that runs an event loop is unsafe, start clean
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    async def infer(self, model: str, texts: List[str]) -> List[Optional[list]]:
+        task = self.tasks.get(model)
+        if task is None or not texts:
+            return [None] * len(texts)
+
+        loop = asyncio.get_running_loop()
+        chunks = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        try:
+            predictions = await asyncio.gather(*[
+                loop.run_in_executor(self.pool, sentiment_lexicon.score_batch, task, chunk)
+                for chunk in chunks
+            ])
+        except BrokenProcessPool as e:
+            # A worker died; start a fresh pool on the next call
+            print(f"Local inference error: {e}")
+            self._pool = None
+            return [None] * len(texts)
+        except Exception as e:
+            print(f"Local inference error: {e}")
+            return [None] * len(texts)
+
+        self.batches += len(chunks)
+        self.texts += len(texts)
+        return [prediction for chunk in predictions for prediction in chunk]
+
+    async def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "workers": self.workers,
+            "batches": self.batches,
+            "texts": self.texts
+        }
@@ -0,0 +1,97 @@
+from typing import Any, Awaitable, Callable, Optional, Tuple
+import asyncio
+from ..config import settings
+from ..utils.cache import normalize_query
+from ..utils.cache_backends import LRUCache
+from ..utils.quota import upstream_priority
+
+class Prefetcher:
+    # Speculatively fetches the page a client is expected to ask for next, so
+    # infinite scroll lands on a warm cache. Prefetches run after the response
+    # is sent, share a global budget and are cancelled when the worker is busy.
+    def __init__(self):
+        self.enabled = settings.PREFETCH_ENABLED
+        self.max_in_flight = settings.PREFETCH_MAX_IN_FLIGHT
+        self.max_active_requests = settings.PREFETCH_MAX_ACTIVE_REQUESTS
+
+        self.active_requests = 0
+        self._tasks = {}
+        # Request keys whose next page is warm, until the client asks for it
+        self._warm = LRUCache(ttl_seconds=settings.PREFETCH_TTL, max_entries=4096)
+
+        self.scheduled = 0
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.cancelled = 0
+        self.hits = 0
+
+    def request_key(
+        self,
+        search_type: str,
+        query: str,
+        page: int,
+        page_size: int,
+        page_token: Optional[str]
+    ) -> Tuple:
+        return (search_type, normalize_query(query), page, page_size, page_token or "")
+
+    def request_started(self, key: Tuple):
+        self.active_requests += 1
+        if self._warm.get(key) is not None:
+            self.hits += 1
+            self._warm.delete(key)
+        if self.active_requests > self.max_active_requests:
+            self.shed()
+
+    def request_finished(self):
+        self.active_requests -= 1
+
+    async def schedule(self, key: Tuple, fetch: Callable[[], Awaitable[Any]]):
+        # Async so FastAPI runs it on the event loop as a background task
+        if not self.enabled or key in self._tasks or self._warm.get(key) is not None:
+            return
+        if len(self._tasks) >= self.max_in_flight or self.active_requests >= self.max_active_requests:
+            self.skipped += 1
+            return
+
+        task = asyncio.ensure_future(self._run(fetch))
+        self._tasks[key] = task
+        self.scheduled += 1
+        task.add_done_callback(lambda done: self._finished(key, done))
+
+    async def _run(self, fetch: Callable[[], Awaitable[Any]]):
+        # Lowest quota priority, prefetching stops first when budgets run low
+        with upstream_priority("speculative"):
+            return await fetch()
+
+    def _finished(self, key: Tuple, task: asyncio.Future):
+        self._tasks.pop(key, None)
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            self.failed += 1
+            print(f"Prefetch error: {task.exception()}")
+            return
+        self.completed += 1
+        self._warm.set(key, True)
+
+    def shed(self):
+        # Real requests come first: drop speculative work under load
+        for task in list(self._tasks.values()):
+            if not task.done():
+                task.cancel()
+                self.cancelled += 1
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "in_flight": len(self._tasks),
+            "scheduled": self.scheduled,
+            "completed": self.completed,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "cancelled": self.cancelled,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.completed if self.completed else 0.0
+        }
@@ -0,0 +1,225 @@
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from functools import lru_cache
+import re
+import numpy as np
+from ..models.search import SearchResult
+
+TRACKING_PARAMS = {"fbclid", "gclid", "igshid", "ref", "ref_src", "si", "feature"}
+
+
+# Cached search results come back on every hit, so the same URLs and titles
+# are seen over and over
+@lru_cache(maxsize=8192)
+def canonicalize_url(url: str) -> str:
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+
+    host = parts.netloc.lower()
+    for prefix in ("www.", "m.", "old."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    path = parts.path.rstrip("/") or "/"
+
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query)
+        if not key.startswith("utm_") and key not in TRACKING_PARAMS
+    ]
+
+    # youtu.be/<id> and youtube.com/watch?v=<id> are the same video
+    if host == "youtu.be":
+        host, query, path = "youtube.com", [("v", path.strip("/"))], "/watch"
+
+    return urlunsplit(("https", host, path, urlencode(sorted(query)), ""))
+
+class ResultRanker:
+    # Merges results from several sources: normalizes each source's own signal
+    # into relevance_score, drops near-duplicates and orders the merged list.
+    def __init__(
+        self,
+        num_hashes: int = 32,
+        bands: int = 8,
+        threshold: float = 0.75,
+        seed: int = 7,
+        max_cached_signatures: int = 8192
+    ):
+        rng = np.random.default_rng(seed)
+        # Odd multipliers for the multiply-shift hash family
+        self.a = rng.integers(1, 1 << 63, size=num_hashes, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 1 << 63, size=num_hashes, dtype=np.uint64)
+        self.bands = bands
+        self.rows = num_hashes // bands
+        self.threshold = threshold
+
+        # Title -> signature row as bytes; dropped wholesale once it outgrows the limit
+        self._signatures = {}
+        self.max_cached_signatures = max_cached_signatures
+
+    def source_signals(self, results: List[SearchResult]) -> np.ndarray:
+        # One source's signal in a single pass; every source returns one type
+        kind = results[0].type
+        if kind == "video":
+            # Set by YouTubeSearchService; ranking never writes to the
+            # originals, so this is still the engagement score
+            return np.array([result.relevance_score for result in results], dtype=np.float64)
+        if kind in ("discussion", "paper"):
+            field = "engagement_score" if kind == "discussion" else "citations"
+            values = np.array([(result.additional_info or {}).get(field) or 0 for result in results], dtype=np.float64)
+            return np.log1p(np.maximum(values, 0))
+        # Web and image results only carry the upstream ranking
+        return -np.arange(len(results), dtype=np.float64)
+
+    def title_matches(self, titles: List[str], query: str) -> np.ndarray:
+        # Share of the query terms found in each (lowercased) title
+        query_terms = set(query.lower().split())
+        matches = np.zeros(len(titles))
+        for term in query_terms:
+            matches += [term in title for title in titles]
+        return matches / max(len(query_terms), 1)
+
+    def compute_scores(self, per_source: Dict[str, List[SearchResult]], query: str) -> np.ndarray:
+        parts = []
+        for source_results in per_source.values():
+            if not source_results:
+                continue
+            # Min-max normalize every source's signal so sources are comparable
+            signals = self.source_signals(source_results)
+            low, high = signals.min(), signals.max()
+            normalized = (signals - low) / (high - low) if high > low else np.ones_like(signals)
+            # Upstream order is a prior of its own; the top of each source lands near
+            # the top of the merged list, which interleaves sources naturally
+            prior = 1.0 - np.arange(len(source_results)) / len(source_results)
+            parts.append(0.45 * normalized + 0.35 * prior)
+        if not parts:
+            return np.zeros(0)
+
+        titles = [result.title.lower() for source_results in per_source.values() for result in source_results]
+        return np.concatenate(parts) + 0.2 * self.title_matches(titles, query)
+
+    def rank(self, per_source: Dict[str, List[SearchResult]], query: str) -> Tuple[List[SearchResult], np.ndarray]:
+        # The original results in score order, with their scores
+        results = [result for source_results in per_source.values() for result in source_results]
+        if not results:
+            return [], np.zeros(0)
+        scores = self.compute_scores(per_source, query)
+        order = np.argsort(-scores, kind="stable")
+        return [results[i] for i in order.tolist()], scores[order]
+
+    def scored_copies(self, results: List[SearchResult], scores: np.ndarray) -> List[SearchResult]:
+        # Results may be shared with the search cache; scores go on copies so
+        # the cached objects (and the video signal above) stay untouched
+        return [
+            result.model_copy(update={"relevance_score": score})
+            for result, score in zip(results, np.round(scores, 4).tolist())
+        ]
+
+    def score(self, per_source: Dict[str, List[SearchResult]], query: str) -> List[SearchResult]:
+        return self.scored_copies(*self.rank(per_source, query))
+
+    def signatures(self, titles: List[str]) -> np.ndarray:
+        # MinHash signatures over word and word-pair shingles, one row per title.
+        # Titles without words get an all-zero row and are never matched.
+        if len(self._signatures) + len(titles) > self.max_cached_signatures:
+            self._signatures.clear()
+        missing = list({title for title in titles if title not in self._signatures})
+        if missing:
+            # Kept as bytes: joining them is much cheaper than stacking arrays
+            self._signatures.update(zip(missing, (row.tobytes() for row in self.compute_signatures(missing))))
+        rows = b"".join([self._signatures[title] for title in titles])
+        return np.frombuffer(rows, dtype=np.uint64).reshape(len(titles), len(self.a))
+
+    def compute_signatures(self, titles: List[str]) -> np.ndarray:
+        shingle_sets = []
+        for title in titles:
+            words = re.findall(r"[a-z0-9]+", title.lower())
+            shingles = {hash(word) for word in words}
+            shingles.update(hash(pair) for pair in zip(words, words[1:]))
+            shingle_sets.append(shingles)
+
+        counts = np.fromiter((len(shingles) for shingles in shingle_sets), dtype=np.int64, count=len(titles))
+        signatures = np.zeros((len(titles), len(self.a)), dtype=np.uint64)
+        if not counts.any():
+            return signatures
+
+        shingles = np.fromiter(
+            (shingle & 0xFFFFFFFF for shingle_set in shingle_sets for shingle in shingle_set),
+            dtype=np.uint64,
+            count=int(counts.sum())
+        )
+        # Multiply-shift hashing; uint64 overflow wraps, which is what we want
+        hashed = (shingles[:, None] * self.a + self.b) >> np.uint64(32)
+        offsets = np.cumsum(counts) - counts
+        present = counts > 0
+        signatures[present] = np.minimum.reduceat(hashed, offsets[present], axis=0)
+        return signatures
+
+    def similar_pairs(self, signatures: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # (earlier, later) index pairs whose signatures agree on at least
+        # threshold of their hashes. Candidates share an LSH band: every
+        # (band, band hash) key is sorted once and equal neighbours are grouped.
+        count = len(signatures)
+        band_hashes = signatures.reshape(count, self.bands, self.rows).sum(axis=2, dtype=np.uint64)
+        band_hashes[~signatures.any(axis=1)] = 0
+        # Band hashes are sums of a few 32-bit values, so the band index fits below them
+        shift = np.uint64(max(self.bands - 1, 1).bit_length())
+        keys = (band_hashes << shift) | np.arange(self.bands, dtype=np.uint64)
+        keys = keys.ravel()
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        # Rows without words hash to 0 in every band and never pair up
+        repeated = (sorted_keys[1:] == sorted_keys[:-1]) & (sorted_keys[1:] >> shift != 0)
+        if not repeated.any():
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+
+        # Pair every entry with each earlier entry of its run: entry i has
+        # `earlier_count[i]` predecessors, starting at the run's first entry
+        rows = order // self.bands
+        run_starts = np.concatenate(([True], ~repeated))
+        first_in_run = np.flatnonzero(run_starts)[np.cumsum(run_starts) - 1]
+        earlier_count = np.arange(len(keys)) - first_in_run
+        later = np.repeat(rows, earlier_count)
+        within_run = np.arange(len(later)) - np.repeat(np.cumsum(earlier_count) - earlier_count, earlier_count)
+        earlier = rows[np.repeat(first_in_run, earlier_count) + within_run]
+        earlier, later = np.minimum(earlier, later), np.maximum(earlier, later)
+
+        pairs = np.unique(earlier * count + later)
+        earlier, later = pairs // count, pairs % count
+        agreement = np.count_nonzero(signatures[earlier] == signatures[later], axis=1)
+        similar = agreement >= self.threshold * signatures.shape[1]
+        return earlier[similar], later[similar]
+
+    def kept_indices(self, results: List[SearchResult]) -> List[int]:
+        # Indices of the first (highest ranked) copy of every URL or near-identical title
+        if not results:
+            return []
+
+        earlier, later = self.similar_pairs(self.signatures([result.title or "" for result in results]))
+        similar_to = {}
+        for first, second in zip(earlier.tolist(), later.tolist()):
+            similar_to.setdefault(second, []).append(first)
+
+        seen_urls = set()
+        kept = []
+        kept_set = set()
+        for index, result in enumerate(results):
+            url = canonicalize_url(result.url) if result.url else result.id
+            if url in seen_urls:
+                continue
+            if index in similar_to and any(other in kept_set for other in similar_to[index]):
+                continue
+            seen_urls.add(url)
+            kept.append(index)
+            kept_set.add(index)
+        return kept
+
+    def deduplicate(self, results: List[SearchResult]) -> List[SearchResult]:
+        return [results[i] for i in self.kept_indices(results)]
+
+    def merge(self, per_source: Dict[str, List[SearchResult]], query: str) -> List[SearchResult]:
+        # De-duplicates before copying, so only the results that are kept are copied
+        results, scores = self.rank(per_source, query)
+        kept = self.kept_indices(results)
+        return self.scored_copies([results[i] for i in kept], scores[kept])
@@ -1,64 +1,110 @@
-import asyncpraw
 from ..config import settings
 from ..models.search import SearchResult
-from ..utils.cache import cached_search
+from ..utils.cache import CachePolicy, cached_search
+from ..utils.http import http_client
+from ..utils.quota import quota_scheduler
+from ..utils.cursor import decode_cursor, encode_cursor
 
 class RedditSearchService:
     def __init__(self):
-        self.reddit = asyncpraw.Reddit(
-            client_id=settings.REDDIT_CLIENT_ID,
-            client_secret=settings.REDDIT_CLIENT_SECRET,
-            user_agent=settings.REDDIT_USER_AGENT
-        )
+        self.reddit = None
 
-    async def search(self, query: str, limit: int = 20, page: int = 1):
-        try:
-            search_results = []
-            subreddit = await self.reddit.subreddit("all")
-            
-            skip_count = (page - 1) * limit
-            
-            async for submission in subreddit.search(
-                query,
-                sort="relevance",
-                time_filter="all",
-                limit=limit + skip_count
-            ):
-                if len(search_results) >= limit:
-                    break
-                    
-                if skip_count > 0:
-                    skip_count -= 1
-                    continue
+    def _get_reddit(self):
+        # Created on first use so the client can share the pooled session,
+        # which only exists once the event loop is running. asyncpraw is
+        # imported here as well, it is slow to import and only needed here.
+        if self.reddit is None:
+            import asyncpraw
+            self.reddit = asyncpraw.Reddit(
+                client_id=settings.REDDIT_CLIENT_ID,
+                client_secret=settings.REDDIT_CLIENT_SECRET,
+                user_agent=settings.REDDIT_USER_AGENT,
+                reddit_url=settings.REDDIT_URL,
+                oauth_url=settings.REDDIT_OAUTH_URL,
+                requestor_kwargs={"session": http_client.session}
+            )
+        return self.reddit
+
+    async def _fetch_submissions(self, query: str, limit: int, skip_count: int, params: dict) -> list:
+        submissions = []
+        subreddit = await self._get_reddit().subreddit("all")
+        async for submission in subreddit.search(
+            query,
+            sort="relevance",
+            time_filter="all",
+            limit=limit + skip_count,
+            params=params
+        ):
+            if len(submissions) >= limit:
+                break
                 
-                try:
-                    # Calculate engagement score
-                    engagement_score = submission.score + (submission.num_comments * 2)
-                    
-                    result = SearchResult(
-                        id=submission.id,
-                        title=submission.title,
-                        description=submission.selftext[:300] if hasattr(submission, 'selftext') else None,
-                        url=f"https://reddit.com{submission.permalink}",
-                        type="discussion",
-                        thumbnail=submission.thumbnail if hasattr(submission, 'thumbnail') and submission.thumbnail.startswith('http') else None,
-                        source_name="Reddit",
-                        source_icon="https://www.redditstatic.com/desktop2x/img/favicon/favicon-32x32.png",
-                        additional_info={
-                            "subreddit": submission.subreddit.display_name,
-                            "score": submission.score,
-                            "num_comments": submission.num_comments,
-                            "engagement_score": engagement_score,
-                            "created_utc": submission.created_utc
-                        }
-                    )
-                    search_results.append(result)
-                except Exception as submission_error:
-                    print(f"Error processing submission: {submission_error}")
-                    continue
+            if skip_count > 0:
+                skip_count -= 1
+                continue
+            submissions.append(submission)
+        return submissions
 
-            return search_results, len(search_results)
-            
+    async def search(self, query: str, limit: int = 20, page: int = 1, cursor: str = None):
+        # Never raises: failures come back as an empty page. The federated
+        # search calls search_or_raise to tell them apart.
+        try:
+            return await self.search_or_raise(query, limit, page, cursor)
         except Exception as e:
             print(f"Reddit Search Error: {e}")
-            return [], 0 
\ No newline at end of file
+            return [], 0, None 
+
+    @cached_search(
+        key_params=("query", "limit", "page", "cursor"),
+        policy=CachePolicy(ttl=300, stale_ttl=900, empty_ttl=30)
+    )
+    async def search_or_raise(self, query: str, limit: int = 20, page: int = 1, cursor: str = None):
+        search_results = []
+        
+        # Continue after the last submission of the previous page when the
+        # client sends its cursor; plain page numbers still skip ahead
+        after = (decode_cursor(cursor) or {}).get("after")
+        skip_count = 0 if after else (page - 1) * limit
+        params = {"after": after} if after else {}
+        last_fullname = None
+        
+        # Only cache misses get here, so quota and the circuit breaker
+        # see real upstream calls. Searching is read-only, safe to retry.
+        submissions = await quota_scheduler.call(
+            "reddit",
+            "search",
+            lambda: self._fetch_submissions(query, limit, skip_count, params),
+            retry=True
+        )
+        for submission in submissions:
+            last_fullname = submission.fullname
+            try:
+                # Calculate engagement score
+                engagement_score = submission.score + (submission.num_comments * 2)
+                
+                result = SearchResult(
+                    id=submission.id,
+                    title=submission.title,
+                    description=submission.selftext[:300] if hasattr(submission, 'selftext') else None,
+                    url=f"https://reddit.com{submission.permalink}",
+                    type="discussion",
+                    thumbnail=submission.thumbnail if hasattr(submission, 'thumbnail') and submission.thumbnail.startswith('http') else None,
+                    source_name="Reddit",
+                    source_icon="https://www.redditstatic.com/desktop2x/img/favicon/favicon-32x32.png",
+                    additional_info={
+                        "subreddit": submission.subreddit.display_name,
+                        "score": submission.score,
+                        "num_comments": submission.num_comments,
+                        "engagement_score": engagement_score,
+                        "created_utc": submission.created_utc
+                    }
+                )
+                search_results.append(result)
+            except Exception as submission_error:
+                print(f"Error processing submission: {submission_error}")
+                continue
+
+        next_cursor = None
+        if last_fullname and len(submissions) >= limit:
+            next_cursor = encode_cursor({"after": last_fullname})
+
+        return search_results, len(search_results), next_cursor
\ No newline at end of file
@@ -1,28 +1,88 @@
-from ..utils.cache import cached_search
-from scholarly import scholarly
+import asyncio
+import threading
+from ..utils.cache import CachePolicy, cached_search, normalize_query
+from ..utils.cache_backends import LRUCache
+from ..utils.cursor import decode_cursor, encode_cursor
+from ..utils.quota import quota_scheduler
+from ..config import settings
 from ..models.search import SearchResult
 
+class ScholarSession:
+    # A live scholarly iterator plus everything it has produced so far, so a
+    # later page only pulls the papers it has not seen yet
+    def __init__(self, query: str):
+        self.query = query
+        self.iterator = None
+        self.papers = []
+        self.exhausted = False
+        self.lock = threading.Lock()
+
+    def fetch(self, offset: int, limit: int) -> list:
+        # Blocking, called from a worker thread
+        with self.lock:
+            if self.iterator is None:
+                # Imported on first use, scholarly pulls in selenium and
+                # takes the better part of a second to import
+                from scholarly import scholarly
+                self.iterator = scholarly.search_pubs(self.query)
+            while not self.exhausted and len(self.papers) < offset + limit:
+                try:
+                    self.papers.append(next(self.iterator))
+                except StopIteration:
+                    self.exhausted = True
+            return self.papers[offset:offset + limit]
+
 class ScholarSearchService:
-    @cached_search
-    async def search(self, query: str, limit: int = 20, page: int = 1):
+    def __init__(self):
+        self.sessions = LRUCache(
+            ttl_seconds=settings.SCHOLAR_SESSION_TTL,
+            max_entries=settings.SCHOLAR_MAX_SESSIONS
+        )
+
+    def _get_session(self, query: str) -> ScholarSession:
+        key = normalize_query(query)
+        session = self.sessions.get(key)
+        if session is None:
+            session = ScholarSession(query)
+        # Re-setting refreshes the TTL while the user keeps paging
+        self.sessions.set(key, session)
+        return session
+
+    async def search(self, query: str, limit: int = 20, page: int = 1, cursor: str = None):
+        # Never raises: failures come back as an empty page. The federated
+        # search calls search_or_raise to tell them apart.
+        try:
+            return await self.search_or_raise(query, limit, page, cursor)
+        except Exception as e:
+            print(f"Scholar Search Error: {e}")
+            return [], 0, None
+
+    @cached_search(
+        key_params=("query", "limit", "page", "cursor"),
+        policy=CachePolicy(ttl=3600, stale_ttl=86400, empty_ttl=60)
+    )
+    async def search_or_raise(self, query: str, limit: int = 20, page: int = 1, cursor: str = None):
+        session = self._get_session(query)
+        offset = (page - 1) * limit
+        # Cursors come from clients; only trust an offset into papers this
+        # session has already produced, anything else falls back to the page
+        cursor_offset = (decode_cursor(cursor) or {}).get("offset")
+        if type(cursor_offset) is int and 0 <= cursor_offset <= len(session.papers):
+            offset = cursor_offset
+        # scholarly is synchronous, run it in a worker thread so it cannot
+        # stall the event loop. Not retried: Scholar blocks scrapers that do.
+        papers = await quota_scheduler.call(
+            "scholar",
+            "search",
+            lambda: asyncio.to_thread(session.fetch, offset, limit)
+        )
+        return self._to_results(papers, offset, limit)
+
+    def _to_results(self, papers: list, offset: int, limit: int):
         try:
-            search_query = scholarly.search_pubs(query)
             search_results = []
             
-            # Skip results for previous pages
-            skip_count = (page - 1) * limit
-            for _ in range(skip_count):
-                try:
-                    next(search_query)
-                except StopIteration:
-                    break
-            
-            # Get results for current page
-            count = 0
-            for paper in search_query:
-                if count >= limit:
-                    break
-                    
+            for count, paper in enumerate(papers, start=offset):
                 try:
                     year = paper.get('bib', {}).get('pub_year')
                     citations = paper.get('num_citations', 0)
@@ -45,10 +105,13 @@ class ScholarSearchService:
                     }
                 )
                 search_results.append(result)
-                count += 1
 
-            return search_results, len(search_results)
+            next_cursor = None
+            if len(papers) == limit:
+                next_cursor = encode_cursor({"offset": offset + limit})
+
+            return search_results, len(search_results), next_cursor
             
         except Exception as e:
             print(f"Scholar Search Error: {e}")
-            return [], 0
+            return [], 0, None
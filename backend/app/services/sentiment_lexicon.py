@@ -0,0 +1,189 @@
+from functools import lru_cache
+from typing import Dict, List
+import re
+import numpy as np
+
+# Lexicon scorer used by the local inference backend. It mirrors the output of
+# the two remote models: go_emotions labels for "emotion" and the three
+# LABEL_n classes of twitter-roberta-base-sentiment for "polarity".
+#
+# Kept free of app imports so process pool workers can load it cheaply.
+
+EMOTIONS = [
+    "admiration", "amusement", "anger", "annoyance", "approval", "caring",
+    "confusion", "curiosity", "desire", "disappointment", "disapproval",
+    "disgust", "embarrassment", "excitement", "fear", "gratitude", "grief",
+    "joy", "love", "nervousness", "optimism", "pride", "realization",
+    "relief", "remorse", "sadness", "surprise", "neutral"
+]
+
+EMOTION_WORDS: Dict[str, List[str]] = {
+    "admiration": ["amazing", "awesome", "brilliant", "excellent", "impressive", "incredible",
+                   "outstanding", "remarkable", "beautiful", "genius", "respect", "admire",
+                   "wonderful", "fantastic", "superb", "masterpiece", "great", "best"],
+    "amusement": ["lol", "lmao", "haha", "hahaha", "funny", "hilarious", "joke", "jokes",
+                  "laughing", "laughed", "rofl", "amusing", "comedy"],
+    "anger": ["angry", "furious", "rage", "hate", "hated", "mad", "outraged", "pissed",
+              "livid", "infuriating", "fury", "hostile"],
+    "annoyance": ["annoying", "annoyed", "irritating", "irritated", "frustrating", "frustrated",
+                  "ugh", "tired", "sick", "bothered", "tedious"],
+    "approval": ["agree", "agreed", "yes", "correct", "right", "exactly", "support",
+                 "approve", "recommend", "recommended", "valid", "fair", "good", "solid"],
+    "caring": ["care", "careful", "help", "helping", "support", "hope", "take", "safe",
+               "hug", "comfort", "kind", "gentle"],
+    "confusion": ["confused", "confusing", "unclear", "huh", "understand", "puzzled",
+                  "lost", "weird", "strange", "why"],
+    "curiosity": ["curious", "wonder", "wondering", "interesting", "question", "how",
+                  "what", "anyone", "explain", "learn", "explore"],
+    "desire": ["want", "wish", "need", "desire", "crave", "hoping", "dream", "would",
+               "longing"],
+    "disappointment": ["disappointed", "disappointing", "letdown", "unfortunately", "sadly",
+                       "meh", "underwhelming", "expected", "worse", "failed"],
+    "disapproval": ["disagree", "wrong", "bad", "terrible", "awful", "poor", "against",
+                    "shouldn't", "nonsense", "misleading", "flawed", "no"],
+    "disgust": ["disgusting", "gross", "nasty", "vile", "repulsive", "sickening",
+                "revolting", "horrible"],
+    "embarrassment": ["embarrassed", "embarrassing", "awkward", "ashamed", "cringe",
+                      "humiliating", "shame"],
+    "excitement": ["excited", "exciting", "hyped", "thrilled", "can't", "wow", "finally",
+                   "stoked", "pumped", "omg"],
+    "fear": ["afraid", "scared", "fear", "terrified", "scary", "worried", "panic",
+             "danger", "dangerous", "threat", "risk", "horror"],
+    "gratitude": ["thanks", "thank", "thx", "grateful", "appreciate", "appreciated",
+                  "thankful", "kudos"],
+    "grief": ["grief", "mourning", "died", "death", "loss", "passed", "funeral", "rip"],
+    "joy": ["happy", "glad", "joy", "enjoy", "enjoyed", "fun", "delighted", "pleased",
+            "yay", "cheerful", "smile", "love"],
+    "love": ["love", "loved", "loving", "adore", "heart", "favorite", "favourite",
+             "sweet", "lovely", "darling"],
+    "nervousness": ["nervous", "anxious", "anxiety", "stress", "stressed", "uneasy",
+                    "tense", "worry"],
+    "optimism": ["hope", "hopefully", "optimistic", "promising", "better", "improve",
+                 "improving", "future", "potential", "confident", "will"],
+    "pride": ["proud", "pride", "accomplished", "achievement", "achieved", "earned"],
+    "realization": ["realized", "realize", "turns", "noticed", "discovered", "aha",
+                    "actually", "found"],
+    "relief": ["relief", "relieved", "phew", "finally", "resolved", "fixed", "solved"],
+    "remorse": ["sorry", "apologize", "apologies", "regret", "regrets", "guilty", "fault"],
+    "sadness": ["sad", "depressed", "unhappy", "cry", "crying", "lonely", "heartbroken",
+                "miserable", "hurt", "pain", "tragic"],
+    "surprise": ["surprised", "surprising", "shocked", "shocking", "unexpected", "wow",
+                 "whoa", "unbelievable", "astonishing"],
+    "neutral": []
+}
+
+# Valence in [-1, 1] for the polarity task
+VALENCE: Dict[str, float] = {
+    **{word: 0.9 for word in ["amazing", "awesome", "excellent", "fantastic", "outstanding",
+                              "superb", "wonderful", "brilliant", "masterpiece", "perfect",
+                              "incredible", "love", "loved", "adore"]},
+    **{word: 0.6 for word in ["good", "great", "nice", "happy", "glad", "helpful", "useful",
+                              "enjoy", "enjoyed", "recommend", "recommended", "best", "thanks",
+                              "thank", "grateful", "appreciate", "beautiful", "impressive",
+                              "fun", "cool", "solid", "effective", "efficient", "benefit",
+                              "benefits", "improve", "improved", "improvement", "success",
+                              "successful", "win", "proud", "promising", "lovely", "favorite"]},
+    **{word: 0.3 for word in ["ok", "okay", "fine", "fair", "decent", "agree", "correct",
+                              "interesting", "hope", "better", "support", "works", "clear",
+                              "easy", "robust", "novel", "accurate", "significant"]},
+    **{word: -0.3 for word in ["confusing", "unclear", "hard", "difficult", "slow", "issue",
+                               "issues", "problem", "problems", "meh", "limited", "expensive",
+                               "complicated", "concern", "concerns", "risk", "weird", "doubt"]},
+    **{word: -0.6 for word in ["bad", "poor", "wrong", "annoying", "frustrating", "disappointed",
+                               "disappointing", "sad", "worse", "fail", "failed", "failure",
+                               "broken", "bug", "bugs", "useless", "sorry", "hurt", "fear",
+                               "scared", "worried", "angry", "mad", "stupid", "waste",
+                               "misleading", "flawed", "unfortunately", "lacks", "crash"]},
+    **{word: -0.9 for word in ["terrible", "awful", "horrible", "hate", "hated", "disgusting",
+                               "worst", "garbage", "trash", "scam", "furious", "pathetic",
+                               "nightmare", "toxic", "vile"]}
+}
+
+NEGATIONS = {"not", "no", "never", "nothing", "nobody", "neither", "nor", "without",
+             "isn't", "wasn't", "aren't", "don't", "doesn't", "didn't", "can't",
+             "won't", "shouldn't", "couldn't", "wouldn't", "hardly", "barely"}
+INTENSIFIERS = {"very": 1.5, "really": 1.4, "so": 1.3, "extremely": 1.8, "super": 1.5,
+                "totally": 1.4, "absolutely": 1.6, "incredibly": 1.7, "slightly": 0.6,
+                "somewhat": 0.7, "kinda": 0.7}
+# Negation applies to the next few tokens
+NEGATION_SCOPE = 3
+
+TOKEN_PATTERN = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+@lru_cache(maxsize=1)
+def _lexicon():
+    vocabulary = sorted(set(VALENCE) | {word for words in EMOTION_WORDS.values() for word in words})
+    index = {word: i for i, word in enumerate(vocabulary)}
+
+    emotion_weights = np.zeros((len(vocabulary), len(EMOTIONS)), dtype=np.float32)
+    for column, emotion in enumerate(EMOTIONS):
+        for word in EMOTION_WORDS[emotion]:
+            emotion_weights[index[word], column] = 1.0
+
+    valence = np.zeros(len(vocabulary), dtype=np.float32)
+    for word, value in VALENCE.items():
+        valence[index[word]] = value
+    return index, emotion_weights, valence
+
+def _features(texts: List[str]):
+    # One dense row per text; the lexicon is small enough that dense
+    # matrices beat building a sparse structure
+    index, emotion_weights, valence = _lexicon()
+    emotion_counts = np.zeros((len(texts), len(index)), dtype=np.float32)
+    signed_counts = np.zeros((len(texts), len(index)), dtype=np.float32)
+    lengths = np.ones(len(texts), dtype=np.float32)
+
+    for row, text in enumerate(texts):
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        lengths[row] = max(len(tokens), 1)
+        negated_until = -1
+        boost = 1.0
+        for position, token in enumerate(tokens):
+            if token in NEGATIONS:
+                negated_until = position + NEGATION_SCOPE
+                continue
+            if token in INTENSIFIERS:
+                boost = INTENSIFIERS[token]
+                continue
+            column = index.get(token)
+            if column is not None:
+                negated = position <= negated_until
+                signed_counts[row, column] += -boost if negated else boost
+                # "not happy" is no evidence of joy
+                if not negated:
+                    emotion_counts[row, column] += boost
+            boost = 1.0
+
+    return emotion_counts, signed_counts, lengths, emotion_weights, valence
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    logits = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+def score_emotions(texts: List[str]) -> np.ndarray:
+    emotion_counts, _, lengths, emotion_weights, _ = _features(texts)
+    logits = 3.5 * (emotion_counts @ emotion_weights)
+    # Neutral wins unless there is emotional evidence, which long texts need more of
+    logits[:, EMOTIONS.index("neutral")] = 2.5 + 0.2 * np.sqrt(lengths)
+    return _softmax(logits)
+
+def score_polarity(texts: List[str]) -> np.ndarray:
+    _, signed_counts, lengths, _, valence = _features(texts)
+    polarity = (signed_counts @ valence) / np.sqrt(lengths)
+    logits = np.stack([-3.0 * polarity, 1.0 - 3.0 * np.abs(polarity), 3.0 * polarity], axis=1)
+    return _softmax(logits)
+
+def score_batch(task: str, texts: List[str]) -> List[list]:
+    # Same shape as the inference API: one list of {"label", "score"} per text
+    if task == "emotion":
+        labels, probabilities = EMOTIONS, score_emotions(texts)
+    elif task == "polarity":
+        labels, probabilities = ["LABEL_0", "LABEL_1", "LABEL_2"], score_polarity(texts)
+    else:
+        raise ValueError(f"Unknown task: {task}")
+
+    return [
+        [{"label": label, "score": score} for label, score in zip(labels, row)]
+        for row in np.round(probabilities.astype(np.float64), 6).tolist()
+    ]
@@ -1,16 +1,51 @@
-from googleapiclient.discovery import build
 from ..config import settings
 from ..models.search import SearchResult
-from ..utils.cache import cached_search
+from ..utils.cache import CachePolicy, cached_search, channel_cache
+from ..utils.metrics import span
+from .google_api import GoogleApiClient
 
 class YouTubeSearchService:
+    # channels().list accepts up to 50 comma-separated IDs per call
+    CHANNEL_BATCH_SIZE = 50
+
     def __init__(self):
-        self.service = build(
-            "youtube", "v3",
-            developerKey=settings.YOUTUBE_API_KEY
-        )
+        self.client = GoogleApiClient("youtube/v3", settings.YOUTUBE_API_KEY, "youtube")
+
+    async def get_channels(self, channel_ids):
+        channels = {}
+        missing = []
+        for channel_id in dict.fromkeys(channel_ids):
+            cached = channel_cache.get(channel_id)
+            if cached is not None:
+                channels[channel_id] = cached
+            else:
+                missing.append(channel_id)
+
+        for i in range(0, len(missing), self.CHANNEL_BATCH_SIZE):
+            batch = missing[i:i + self.CHANNEL_BATCH_SIZE]
+            try:
+                # Channel stats only refine the ranking, first to go under quota pressure
+                response = await self.client.get(
+                    "channels",
+                    priority="enrichment",
+                    part="statistics,status,brandingSettings,contentOwnerDetails",
+                    id=",".join(batch),
+                    maxResults=self.CHANNEL_BATCH_SIZE
+                )
+            except Exception as e:
+                print(f"Error fetching channel details: {e}")
+                continue
+
+            found = {channel['id']: channel for channel in response.get('items', [])}
+            for channel_id in batch:
+                # Cache unknown channels as empty so they are not looked up again
+                channel = found.get(channel_id, {})
+                channel_cache.set(channel_id, channel)
+                channels[channel_id] = channel
 
-    def calculate_video_score(self, item, query):
+        return channels
+
+    def calculate_video_score(self, item, query, channel=None):
         score = 0.0
         query_terms = set(term.lower() for term in query.split())
         
@@ -20,22 +55,13 @@ class YouTubeSearchService:
             title_matches = sum(1 for term in query_terms if term in title)
             score += min(8.0, title_matches * 2.0)
             
-            # Get channel details
-            channel_id = item['snippet']['channelId']
-            channel_response = self.service.channels().list(
-                part="statistics,status,brandingSettings,contentOwnerDetails",
-                id=channel_id
-            ).execute()
-            
-            if channel_response['items']:
-                channel = channel_response['items'][0]
-                
+            if channel:
                 # Official channel verification (10 points)
-                if channel['status'].get('isLinked', False):
+                if channel.get('status', {}).get('isLinked', False):
                     score += 10.0
                     
                 # Channel authority based on subscribers (0-15 points)
-                subscriber_count = int(channel['statistics'].get('subscriberCount', 0))
+                subscriber_count = int(channel.get('statistics', {}).get('subscriberCount', 0))
                 if subscriber_count > 10000000:  # 10M+
                     score += 15.0
                 elif subscriber_count > 1000000:  # 1M+
@@ -103,77 +129,95 @@ class YouTubeSearchService:
         
         return score
 
-    @cached_search
     async def search(self, query: str, page_token: str = None, page_size: int = 20):
+        # Never raises: failures come back as an empty page. The federated
+        # search calls search_or_raise to tell them apart.
         try:
-            search_params = {
-                "q": query,
-                "part": "snippet",  # Remove statistics from initial search
-                "maxResults": min(50, page_size * 2),
-                "type": "video",
-                "videoEmbeddable": "true",
-                "videoSyndicated": "true"
-            }
-            
-            if page_token:
-                search_params["pageToken"] = page_token
+            return await self.search_or_raise(query, page_token, page_size)
+        except Exception as e:
+            print(f"YouTube Search Error: {e}")
+            return [], 0, None 
 
-            results = self.service.search().list(**search_params).execute()
-            
-            # Get detailed video information
-            video_ids = [item['id']['videoId'] for item in results.get('items', [])]
-            
-            # Separate request for video statistics
-            videos_response = self.service.videos().list(
-                part="statistics,snippet",
-                id=','.join(video_ids)
-            ).execute()
-            
-            # Create a mapping of video details
-            video_details = {
-                item['id']: item for item in videos_response.get('items', [])
-            }
-            
-            # Calculate scores and sort results
+    @cached_search(
+        key_params=("query", "page_token", "page_size"),
+        policy=CachePolicy(ttl=600, stale_ttl=1800, empty_ttl=30)
+    )
+    async def search_or_raise(self, query: str, page_token: str = None, page_size: int = 20):
+        search_params = {
+            "q": query,
+            "part": "snippet",  # Remove statistics from initial search
+            "maxResults": min(50, page_size * 2),
+            "type": "video",
+            "videoEmbeddable": "true",
+            "videoSyndicated": "true"
+        }
+        
+        if page_token:
+            search_params["pageToken"] = page_token
+
+        results = await self.client.get("search", **search_params)
+        
+        # Get detailed video information
+        video_ids = [item['id']['videoId'] for item in results.get('items', [])]
+        
+        # Separate request for video statistics
+        videos_response = await self.client.get(
+            "videos",
+            part="statistics,snippet",
+            id=','.join(video_ids)
+        )
+        
+        # Create a mapping of video details
+        video_details = {
+            item['id']: item for item in videos_response.get('items', [])
+        }
+        
+        # Resolve every channel on the page with one batched lookup
+        channels = await self.get_channels([
+            details['snippet']['channelId']
+            for details in video_details.values()
+            if details.get('snippet', {}).get('channelId')
+        ])
+
+        # Calculate scores and sort results
+        with span("youtube_scoring"):
             scored_results = []
             for item in results.get("items", []):
                 video_id = item['id']['videoId']
                 if video_id in video_details:
                     # Combine search result with video details
                     full_details = video_details[video_id]
-                    score = self.calculate_video_score(full_details, query)
+                    channel = channels.get(full_details.get('snippet', {}).get('channelId'))
+                    score = self.calculate_video_score(full_details, query, channel)
                     scored_results.append((score, item, full_details))
-            
+
             # Sort by score and take top results
             scored_results.sort(reverse=True, key=lambda x: x[0])
-            top_results = scored_results[:page_size]
-            
-            search_results = []
-            for _, item, details in top_results:
-                try:
-                    video_id = item['id']['videoId']
-                    result = SearchResult(
-                        id=video_id,
-                        title=item["snippet"]["title"],
-                        description=item["snippet"]["description"],
-                        url=f"https://youtube.com/watch?v={video_id}",
-                        thumbnail=item["snippet"]["thumbnails"]["high"]["url"],
-                        type="video",
-                        source_name=item["snippet"]["channelTitle"],
-                        source_icon="https://www.youtube.com/favicon.ico",
-                        additional_info={
-                            "channel": item["snippet"]["channelTitle"],
-                            "published_at": item["snippet"]["publishedAt"],
-                            "view_count": details["statistics"].get("viewCount"),
-                            "like_count": details["statistics"].get("likeCount")
-                        }
-                    )
-                    search_results.append(result)
-                except KeyError:
-                    continue
+        top_results = scored_results[:page_size]
+        
+        search_results = []
+        for score, item, details in top_results:
+            try:
+                video_id = item['id']['videoId']
+                result = SearchResult(
+                    id=video_id,
+                    title=item["snippet"]["title"],
+                    description=item["snippet"]["description"],
+                    url=f"https://youtube.com/watch?v={video_id}",
+                    thumbnail=item["snippet"]["thumbnails"]["high"]["url"],
+                    type="video",
+                    source_name=item["snippet"]["channelTitle"],
+                    source_icon="https://www.youtube.com/favicon.ico",
+                    relevance_score=score,
+                    additional_info={
+                        "channel": item["snippet"]["channelTitle"],
+                        "published_at": item["snippet"]["publishedAt"],
+                        "view_count": details["statistics"].get("viewCount"),
+                        "like_count": details["statistics"].get("likeCount")
+                    }
+                )
+                search_results.append(result)
+            except KeyError:
+                continue
 
-            return search_results, len(search_results), results.get("nextPageToken")
-            
-        except Exception as e:
-            print(f"YouTube Search Error: {e}")
-            return [], 0, None 
+        return search_results, len(search_results), results.get("nextPageToken")
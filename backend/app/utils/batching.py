@@ -0,0 +1,106 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+import asyncio
+
+class MicroBatcher:
+    # Collects items submitted by concurrent callers for up to `max_wait`
+    # seconds, or until `max_batch_size` distinct items are pending, processes
+    # them in one call and hands every caller back its own results in order.
+    # Identical items pending at the same time are processed once.
+    #
+    # With max_in_flight set, items keep accumulating while that many batches
+    # are running, and the next batch starts as soon as one finishes. Under
+    # load batches grow instead of queueing behind each other.
+    def __init__(
+        self,
+        process: Callable[[List[Hashable]], Awaitable[List[Any]]],
+        max_batch_size: int,
+        max_wait: float,
+        max_in_flight: Optional[int] = None
+    ):
+        self.process = process
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_in_flight = max_in_flight
+        self._pending: Dict[Hashable, List[asyncio.Future]] = {}
+        self._timer = None
+        # Keeps running batches referenced until they finish
+        self._running = set()
+
+        self.batches = 0
+        self.items = 0
+        self.submitted = 0
+        # Why batches started: full, waited max_wait, or a busy slot freed up
+        self.flushes = {"size": 0, "timer": 0, "capacity": 0}
+        self.largest_batch = 0
+
+    async def submit(self, items: List[Hashable]) -> List[Any]:
+        loop = asyncio.get_running_loop()
+        futures = []
+        for item in items:
+            future = loop.create_future()
+            self._pending.setdefault(item, []).append(future)
+            futures.append(future)
+            if len(self._pending) >= self.max_batch_size:
+                self._flush("size")
+
+        self.submitted += len(items)
+        if self._pending and self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush_on_timer)
+        return list(await asyncio.gather(*futures))
+
+    def _flush_on_timer(self):
+        self._timer = None
+        self._flush("timer")
+
+    def _flush(self, reason: str):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._pending and (self.max_in_flight is None or len(self._running) < self.max_in_flight):
+            items = list(self._pending)[:self.max_batch_size]
+            batch = {item: self._pending.pop(item) for item in items}
+            self.flushes[reason] += 1
+            task = asyncio.ensure_future(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Future):
+        self._running.discard(task)
+        # Whatever piled up while every slot was busy goes next
+        if self._pending:
+            self._flush("capacity")
+
+    async def _run(self, batch: Dict[Hashable, List[asyncio.Future]]):
+        items = list(batch)
+        self.batches += 1
+        self.items += len(items)
+        self.largest_batch = max(self.largest_batch, len(items))
+
+        try:
+            results = await self.process(items)
+        except Exception as e:
+            results = None
+            error = e
+
+        for index, item in enumerate(items):
+            for future in batch[item]:
+                # The caller may have been cancelled meanwhile
+                if future.done():
+                    continue
+                if results is None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(results[index])
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "submitted": self.submitted,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "flushes": dict(self.flushes),
+            "in_flight": len(self._running),
+            "pending": len(self._pending)
+        }
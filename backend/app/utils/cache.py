@@ -1,42 +1,273 @@
-from functools import lru_cache
-from typing import Any, Callable
-from datetime import datetime, timedelta
-
-class TimedCache:
-    def __init__(self, ttl_seconds: int = 300):
-        self.ttl_seconds = ttl_seconds
-        self.cache = {}
-        self.timestamps = {}
-
-    def get(self, key: str) -> Any:
-        if key in self.cache:
-            timestamp = self.timestamps[key]
-            if datetime.now() - timestamp < timedelta(seconds=self.ttl_seconds):
-                return self.cache[key]
-            else:
-                del self.cache[key]
-                del self.timestamps[key]
-        return None
+from functools import wraps
+from typing import Any, Awaitable, Callable, Iterable, Optional
+import asyncio
+import hashlib
+import inspect
+import json
+import unicodedata
+from ..config import settings
+from .cache_backends import LRUCache, create_cache_backend
+from .metrics import span
+from .quota import current_priority, upstream_priority
+
+class SingleFlight:
+    # Coalesces concurrent calls for the same key: the first caller starts the
+    # work, later callers await the same task instead of repeating it
+    def __init__(self):
+        self._inflight = {}
+        self._waiters = {}
+        self.calls = 0
+        self.shared = 0
+        self.abandoned = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            self._waiters[task] = 0
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.calls += 1
+        else:
+            self.shared += 1
+
+        # Shielded so a cancelled caller does not cancel the work for the
+        # others; the work is only cancelled once nobody is waiting for it
+        self._waiters[task] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._waiters[task] == 1:
+                task.cancel()
+                self.abandoned += 1
+            raise
+        finally:
+            if task in self._waiters:
+                self._waiters[task] -= 1
+
+    def _forget(self, key: str, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        self._waiters.pop(task, None)
+        # Nobody may be left to read a failure, mark it retrieved
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._inflight),
+            "calls": self.calls,
+            "shared": self.shared,
+            "abandoned": self.abandoned
+        }
+
+class CachePolicy:
+    # ttl: how long a result is served as fresh
+    # stale_ttl: how long after that it is still served while a background refresh runs
+    # empty_ttl: lifetime for empty results, which services also return on upstream
+    # errors; 0 disables caching them
+    def __init__(self, ttl: float = 300, stale_ttl: float = 0, empty_ttl: float = 30):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.empty_ttl = empty_ttl
+
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.empty_results = 0
+
+    def is_empty(self, result: Any) -> bool:
+        # Services return ([], 0) or [] when nothing was found or the upstream failed
+        if isinstance(result, tuple):
+            return not result or not result[0]
+        return not result
+
+    def stats(self) -> dict:
+        return {
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+            "empty_ttl": self.empty_ttl,
+            "fresh_hits": self.fresh_hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "empty_results": self.empty_results
+        }
+
+class InferenceCache:
+    # Content-addressed store for model outputs. Entries are keyed by model,
+    # normalized input text and parameters, so the same post or abstract is
+    # inferred once per model whichever query or page it shows up on.
+    def __init__(self, ttl_seconds: float, max_entries: int, max_bytes: Optional[int] = None):
+        self.cache = LRUCache(ttl_seconds=ttl_seconds, max_entries=max_entries, max_bytes=max_bytes)
+        self.hits = {}
+        self.misses = {}
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        # Case is kept, the models are case sensitive
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    def key(self, model: str, text: str, params: Optional[dict] = None) -> str:
+        payload = json.dumps([model, self.normalize_text(text), params or {}], sort_keys=True)
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    def get(self, model: str, text: str, params: Optional[dict] = None) -> Any:
+        value = self.cache.get(self.key(model, text, params))
+        counter = self.hits if value is not None else self.misses
+        counter[model] = counter.get(model, 0) + 1
+        return value
+
+    def set(self, model: str, text: str, value: Any, params: Optional[dict] = None):
+        self.cache.set(self.key(model, text, params), value)
+
+    def stats(self) -> dict:
+        models = {}
+        for model in self.hits.keys() | self.misses.keys():
+            hits, misses = self.hits.get(model, 0), self.misses.get(model, 0)
+            models[model] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": hits / (hits + misses)
+            }
+        return {**self.cache.stats(), "models": models}
+
+search_cache = create_cache_backend()
+channel_cache = LRUCache(
+    ttl_seconds=86400,  # Channel statistics change slowly, keep for a day
+    max_entries=settings.CHANNEL_CACHE_MAX_ENTRIES,
+    max_bytes=settings.CHANNEL_CACHE_MAX_BYTES
+)
+inference_cache = InferenceCache(
+    ttl_seconds=settings.AI_CACHE_TTL,
+    max_entries=settings.AI_CACHE_MAX_ENTRIES,
+    max_bytes=settings.AI_CACHE_MAX_BYTES
+)
+search_flight = SingleFlight()
 
-    def set(self, key: str, value: Any):
-        self.cache[key] = value
-        self.timestamps[key] = datetime.now()
+# Policies of every cached_search function, by qualified name, for /stats
+cache_policies = {}
 
-search_cache = TimedCache(ttl_seconds=300)  # 5 minutes cache
+# Keeps background refresh tasks referenced until they finish
+_background_tasks = set()
 
-def cached_search(func: Callable):
+def _run_in_background(coro: Awaitable[Any]):
+    task = asyncio.ensure_future(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+def _flight_key(cache_key: str) -> str:
+    # Callers only share a fetch made at their own priority: a user request
+    # joining a prefetch or refresh would inherit its lower quota priority
+    priority = current_priority()
+    return cache_key if priority == "core" else f"{cache_key}:{priority}"
+
+async def _refresh(cache_key: str, fetch: Callable[..., Awaitable[Any]]):
+    # Speculative priority: with quotas running low the stale value keeps
+    # being served instead of spending budget on revalidation. Nobody awaits
+    # this task; fetch() already counted the failure, so only log it here
+    # instead of leaving the exception unretrieved.
+    try:
+        with upstream_priority("speculative"):
+            await search_flight.do(_flight_key(cache_key), lambda: fetch(refresh=True))
+    except Exception as e:
+        print(f"Cache refresh error: {e}")
+
+def normalize_query(text: str) -> str:
+    # "Python  Tutorial", "python tutorial" and full-width variants share a key
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+def make_cache_key(
+    func: Callable,
+    args: tuple,
+    kwargs: dict,
+    key_params: Optional[Iterable[str]] = None,
+    query_params: Iterable[str] = ("query",),
+    signature: Optional[inspect.Signature] = None
+) -> str:
+    # Bind to the signature so positional and keyword calls produce the same key
+    bound = (signature or inspect.signature(func)).bind(*args, **kwargs)
+    bound.apply_defaults()
+
+    params = {}
+    for name, value in bound.arguments.items():
+        if name == "self" or (key_params is not None and name not in key_params):
+            continue
+        if name in query_params and isinstance(value, str):
+            value = normalize_query(value)
+        params[name] = value
+
+    payload = json.dumps([func.__module__, func.__qualname__, params], sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+def cached_search(
+    func: Optional[Callable] = None,
+    *,
+    key_params: Optional[Iterable[str]] = None,
+    query_params: Iterable[str] = ("query",),
+    policy: Optional[CachePolicy] = None
+):
+    # Usable bare (@cached_search) or with the parameters that affect the
+    # result (@cached_search(key_params=("query", "page")))
+    if func is None:
+        return lambda f: cached_search(f, key_params=key_params, query_params=query_params, policy=policy)
+
+    signature = inspect.signature(func)
+    key_params = tuple(key_params) if key_params is not None else None
+    query_params = tuple(query_params)
+    policy = policy or CachePolicy()
+    cache_policies[func.__qualname__] = policy
+
+    @wraps(func)
     async def wrapper(*args, **kwargs):
-        # Create cache key from function name and arguments
-        cache_key = f"{func.__name__}:{str(args)}:{str(kwargs)}"
-        
+        cache_key = make_cache_key(func, args, kwargs, key_params, query_params, signature)
+
+        async def fetch(refresh: bool = False):
+            try:
+                result = await func(*args, **kwargs)
+            except Exception:
+                if refresh:
+                    policy.refresh_failures += 1
+                raise
+
+            if not policy.is_empty(result):
+                await search_cache.set(cache_key, result, ttl=policy.ttl, stale_ttl=policy.stale_ttl)
+            else:
+                policy.empty_results += 1
+                if refresh:
+                    # Keep serving the stale value rather than replacing it with an error
+                    policy.refresh_failures += 1
+                elif policy.empty_ttl > 0 and current_priority() == "core":
+                    # Below core priority an empty result is usually the quota
+                    # refusing speculative work, not the upstream having
+                    # nothing; caching it would answer the user's request with it
+                    await search_cache.set(cache_key, result, ttl=policy.empty_ttl)
+            return result
+
         # Check cache
-        cached_result = search_cache.get(cache_key)
-        if cached_result is not None:
+        with span("cache"):
+            entry = await search_cache.get_entry(cache_key)
+        if entry is not None:
+            cached_result, fresh = entry
+            if fresh:
+                policy.fresh_hits += 1
+                return cached_result
+
+            # Serve the stale value now and revalidate off the request path
+            policy.stale_hits += 1
+            policy.refreshes += 1
+            _run_in_background(_refresh(cache_key, fetch))
             return cached_result
-        
-        # Execute function and cache result
-        result = await func(*args, **kwargs)
-        search_cache.set(cache_key, result)
-        return result
-    
-    return wrapper 
\ No newline at end of file
+
+        # Execute function and cache result, sharing the call with any
+        # concurrent request for the same key
+        policy.misses += 1
+        return await search_flight.do(_flight_key(cache_key), fetch)
+
+    wrapper.cache = search_cache
+    wrapper.key_params = key_params
+    wrapper.policy = policy
+    return wrapper
@@ -0,0 +1,445 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pydantic import BaseModel
+from ..config import settings
+from ..models.search import SearchResult, SearchResponse
+
+# Rough sizes in bytes, calibrated against a full sys.getsizeof walk on CPython
+OBJECT_OVERHEAD = 64
+MODEL_OVERHEAD = 1400
+# Longer lists and tuples are extrapolated from their first items
+SIZE_SAMPLE = 4
+
+def estimate_size(value: Any, depth: int = 0) -> int:
+    # Approximate size in bytes, good enough to enforce a memory budget. Runs
+    # on every set(), so models are not walked: their string fields are
+    # counted and everything else is a fixed overhead per field or item.
+    # Pages hold results of one kind, so long sequences are sampled.
+    value_type = type(value)
+    if value_type is str or value_type is bytes:
+        return OBJECT_OVERHEAD + len(value)
+    if value_type is list or value_type is tuple:
+        if depth >= 4:
+            return OBJECT_OVERHEAD
+        sample = sum(estimate_size(item, depth + 1) for item in value[:SIZE_SAMPLE])
+        return OBJECT_OVERHEAD + sample * len(value) // max(min(len(value), SIZE_SAMPLE), 1)
+    if value_type is dict:
+        if depth >= 4:
+            return OBJECT_OVERHEAD
+        return OBJECT_OVERHEAD + sum(
+            estimate_size(k, depth + 1) + estimate_size(v, depth + 1) for k, v in value.items()
+        )
+    if isinstance(value, BaseModel):
+        size = MODEL_OVERHEAD
+        for field in value.__dict__.values():
+            field_type = type(field)
+            if field_type is str:
+                size += len(field)
+            elif field_type is dict or field_type is list:
+                size += OBJECT_OVERHEAD * len(field)
+        return size
+    return OBJECT_OVERHEAD
+
+class LRUCache:
+    def __init__(
+        self,
+        ttl_seconds: float = 300,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        sweep_interval: float = 60
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+
+        # key -> (value, fresh_until, expires_at, size), least recently used first.
+        # Between fresh_until and expires_at an entry is stale but still servable.
+        self._entries = OrderedDict()
+        self.current_bytes = 0
+        self._next_sweep = time.monotonic() + sweep_interval
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_hits = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any:
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, bool]]:
+        # Returns (value, is_fresh), or None once the entry is hard-expired
+        now = time.monotonic()
+        self._maybe_sweep(now)
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, fresh_until, expires_at, _ = entry
+        if expires_at <= now:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        if fresh_until <= now:
+            self.stale_hits += 1
+            return value, False
+        return value, True
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, stale_ttl: float = 0):
+        now = time.monotonic()
+        self._maybe_sweep(now)
+
+        size = estimate_size(value)
+        if key in self._entries:
+            self._remove(key)
+        if size > self.max_bytes:
+            return
+
+        fresh_until = now + (self.ttl_seconds if ttl is None else ttl)
+        self._entries[key] = (value, fresh_until, fresh_until + stale_ttl, size)
+        self.current_bytes += size
+
+        while len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes:
+            evicted_key = next(iter(self._entries))
+            self._remove(evicted_key)
+            self.evictions += 1
+
+    def delete(self, key: str):
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self):
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def sweep(self):
+        # Proactively drop expired entries that are never read again
+        now = time.monotonic()
+        expired = [key for key, (_, _, expires_at, _) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        self._next_sweep = now + self.sweep_interval
+
+    def _maybe_sweep(self, now: float):
+        if now >= self._next_sweep:
+            self.sweep()
+
+    def _remove(self, key: str):
+        _, _, _, size = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "stale_hits": self.stale_hits,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+# Async storage interface behind cached_search. Entries carry a fresh and a
+# hard expiry; get_entry returns (value, is_fresh) until the hard expiry.
+class CacheBackend(ABC):
+    @abstractmethod
+    async def get_entry(self, key: str) -> Optional[Tuple[Any, bool]]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float, stale_ttl: float = 0):
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str):
+        ...
+
+    async def close(self):
+        pass
+
+    def stats(self) -> dict:
+        return {}
+
+class MemoryBackend(CacheBackend):
+    def __init__(self, cache: LRUCache):
+        self.cache = cache
+
+    async def get_entry(self, key: str) -> Optional[Tuple[Any, bool]]:
+        return self.cache.get_entry(key)
+
+    async def set(self, key: str, value: Any, ttl: float, stale_ttl: float = 0):
+        self.cache.set(key, value, ttl=ttl, stale_ttl=stale_ttl)
+
+    async def delete(self, key: str):
+        self.cache.delete(key)
+
+    def stats(self) -> dict:
+        return {"backend": "memory", **self.cache.stats()}
+
+# Compact serialization for shared backends: JSON with tagged models and
+# tuples, zlib compressed. Pydantic models drop their default-valued fields.
+_MODELS = {model.__name__: model for model in (SearchResult, SearchResponse)}
+
+def _pack(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return {"__model__": type(value).__name__, "data": value.model_dump(exclude_defaults=True)}
+    if isinstance(value, tuple):
+        return {"__tuple__": [_pack(item) for item in value]}
+    if isinstance(value, list):
+        return [_pack(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _pack(item) for key, item in value.items()}
+    return value
+
+def _unpack(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_unpack(item) for item in value]
+    if isinstance(value, dict):
+        if "__model__" in value:
+            return _MODELS[value["__model__"]](**value["data"])
+        if "__tuple__" in value:
+            return tuple(_unpack(item) for item in value["__tuple__"])
+        return {key: _unpack(item) for key, item in value.items()}
+    return value
+
+def encode_value(value: Any, fresh_until: float) -> bytes:
+    payload = json.dumps([fresh_until, _pack(value)], separators=(",", ":"))
+    return zlib.compress(payload.encode(), 1)
+
+def decode_value(data: bytes) -> Tuple[Any, float]:
+    fresh_until, value = json.loads(zlib.decompress(data))
+    return _unpack(value), fresh_until
+
+class SQLiteBackend(CacheBackend):
+    # On-disk store shared by every worker process on the host. Expiry uses
+    # wall-clock time since monotonic clocks are not comparable across processes.
+    def __init__(self, path: str, max_entries: int = 100000, sweep_interval: float = 60):
+        self.path = path
+        self.max_entries = max_entries
+        self.sweep_interval = sweep_interval
+        self._next_sweep = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)")
+
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.errors = 0
+
+    def _get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set(self, key: str, data: bytes, expires_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, data, expires_at)
+            )
+            now = time.time()
+            if now >= self._next_sweep:
+                self._next_sweep = now + self.sweep_interval
+                self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+                # Bound the table by dropping the entries closest to expiry
+                self._conn.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+
+    def _delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    async def get_entry(self, key: str) -> Optional[Tuple[Any, bool]]:
+        try:
+            data = await asyncio.to_thread(self._get, key)
+            if data is None:
+                self.misses += 1
+                return None
+            value, fresh_until = decode_value(data)
+        except Exception as e:
+            self.errors += 1
+            print(f"SQLite cache read error: {e}")
+            return None
+
+        self.hits += 1
+        fresh = fresh_until > time.time()
+        if not fresh:
+            self.stale_hits += 1
+        return value, fresh
+
+    async def set(self, key: str, value: Any, ttl: float, stale_ttl: float = 0):
+        fresh_until = time.time() + ttl
+        try:
+            await asyncio.to_thread(self._set, key, encode_value(value, fresh_until), fresh_until + stale_ttl)
+        except Exception as e:
+            self.errors += 1
+            print(f"SQLite cache write error: {e}")
+
+    async def delete(self, key: str):
+        await asyncio.to_thread(self._delete, key)
+
+    async def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "stale_hits": self.stale_hits,
+            "errors": self.errors
+        }
+
+class RedisBackend(CacheBackend):
+    # Any server speaking the Redis protocol (Redis, Valkey, KeyDB, Dragonfly)
+    def __init__(self, url: str, prefix: str = "neuraseek:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package") from e
+
+        self.url = url
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url)
+
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.errors = 0
+
+    async def get_entry(self, key: str) -> Optional[Tuple[Any, bool]]:
+        try:
+            data = await self.client.get(self.prefix + key)
+            if data is None:
+                self.misses += 1
+                return None
+            value, fresh_until = decode_value(data)
+        except Exception as e:
+            self.errors += 1
+            print(f"Redis cache read error: {e}")
+            return None
+
+        self.hits += 1
+        fresh = fresh_until > time.time()
+        if not fresh:
+            self.stale_hits += 1
+        return value, fresh
+
+    async def set(self, key: str, value: Any, ttl: float, stale_ttl: float = 0):
+        fresh_until = time.time() + ttl
+        try:
+            await self.client.set(
+                self.prefix + key,
+                encode_value(value, fresh_until),
+                px=max(1, int((ttl + stale_ttl) * 1000))
+            )
+        except Exception as e:
+            self.errors += 1
+            print(f"Redis cache write error: {e}")
+
+    async def delete(self, key: str):
+        await self.client.delete(self.prefix + key)
+
+    async def close(self):
+        await self.client.aclose()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "redis",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "stale_hits": self.stale_hits,
+            "errors": self.errors
+        }
+
+class TieredBackend(CacheBackend):
+    # In-process L1 in front of a shared L2. L1 only holds fresh values for a
+    # short time so workers do not drift far from what L2 has.
+    def __init__(self, l1: LRUCache, l2: CacheBackend, l1_ttl: float = 30):
+        self.l1 = l1
+        self.l2 = l2
+        self.l1_ttl = l1_ttl
+
+    async def get_entry(self, key: str) -> Optional[Tuple[Any, bool]]:
+        entry = self.l1.get_entry(key)
+        if entry is not None:
+            return entry
+
+        entry = await self.l2.get_entry(key)
+        if entry is not None and entry[1]:
+            self.l1.set(key, entry[0], ttl=self.l1_ttl)
+        return entry
+
+    async def set(self, key: str, value: Any, ttl: float, stale_ttl: float = 0):
+        self.l1.set(key, value, ttl=min(ttl, self.l1_ttl))
+        await self.l2.set(key, value, ttl=ttl, stale_ttl=stale_ttl)
+
+    async def delete(self, key: str):
+        self.l1.delete(key)
+        await self.l2.delete(key)
+
+    async def close(self):
+        await self.l2.close()
+
+    def stats(self) -> dict:
+        return {"backend": "tiered", "l1": self.l1.stats(), "l2": self.l2.stats()}
+
+def create_cache_backend() -> CacheBackend:
+    memory = LRUCache(
+        ttl_seconds=300,  # 5 minutes cache
+        max_entries=settings.CACHE_MAX_ENTRIES,
+        max_bytes=settings.CACHE_MAX_BYTES
+    )
+
+    if settings.CACHE_BACKEND == "memory":
+        return MemoryBackend(memory)
+    if settings.CACHE_BACKEND == "sqlite":
+        shared = SQLiteBackend(settings.CACHE_SQLITE_PATH, max_entries=settings.CACHE_SQLITE_MAX_ENTRIES)
+    elif settings.CACHE_BACKEND == "redis":
+        shared = RedisBackend(settings.CACHE_REDIS_URL)
+    else:
+        raise ValueError(f"Unknown CACHE_BACKEND: {settings.CACHE_BACKEND}")
+
+    if settings.CACHE_L1_TTL > 0:
+        return TieredBackend(memory, shared, l1_ttl=settings.CACHE_L1_TTL)
+    return shared
@@ -0,0 +1,19 @@
+from typing import Optional
+import base64
+import json
+
+# Opaque continuation tokens handed to clients as next_page_token
+
+def encode_cursor(state: dict) -> str:
+    payload = json.dumps(state, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_cursor(token: Optional[str]) -> Optional[dict]:
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        return None
+    return state if isinstance(state, dict) else None
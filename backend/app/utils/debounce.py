@@ -0,0 +1,38 @@
+from typing import Hashable, Optional
+import asyncio
+
+class Debouncer:
+    # Latest-wins window per client: a request waits `window` seconds and only
+    # proceeds if no newer request from the same client arrived meanwhile
+    def __init__(self, window: float):
+        self.window = window
+        self._latest = {}
+        self._sequence = 0
+
+        self.passed = 0
+        self.superseded = 0
+
+    async def wait(self, client: Optional[Hashable]) -> bool:
+        if self.window <= 0 or client is None:
+            return True
+
+        self._sequence += 1
+        sequence = self._sequence
+        self._latest[client] = sequence
+        await asyncio.sleep(self.window)
+
+        if self._latest.get(client) != sequence:
+            self.superseded += 1
+            return False
+        # The newest request cleans up, so the map only holds clients mid-window
+        del self._latest[client]
+        self.passed += 1
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "window": self.window,
+            "waiting_clients": len(self._latest),
+            "passed": self.passed,
+            "superseded": self.superseded
+        }
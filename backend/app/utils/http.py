@@ -0,0 +1,99 @@
+import time
+import aiohttp
+from ..config import settings
+
+# Application-scoped, connection-pooled HTTP client shared by every outbound
+# service. The session is opened on startup and closed on shutdown; connections
+# are kept alive between requests so upstream TLS handshakes are paid once.
+class HttpClient:
+    def __init__(self):
+        self._session = None
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.queued = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+        return self._session
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=settings.HTTP_POOL_SIZE,
+            limit_per_host=settings.HTTP_POOL_SIZE_PER_HOST,
+            ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL,
+            keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT
+        )
+        # No session-wide total: every call runs under its upstream's own
+        # adaptive deadline (Upstream.timeout()), which may exceed UPSTREAM_TIMEOUT
+        timeout = aiohttp.ClientTimeout(
+            total=None,
+            connect=settings.HTTP_CONNECT_TIMEOUT
+        )
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_create_end.append(self._on_connection_create)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuse)
+        trace_config.on_connection_queued_start.append(self._on_queued_start)
+        trace_config.on_connection_queued_end.append(self._on_queued_end)
+
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            trace_configs=[trace_config]
+        )
+
+    async def _on_request_start(self, session, context, params):
+        self.requests += 1
+
+    async def _on_connection_create(self, session, context, params):
+        self.connections_created += 1
+
+    async def _on_connection_reuse(self, session, context, params):
+        self.connections_reused += 1
+
+    async def _on_queued_start(self, session, context, params):
+        context.queued_at = time.perf_counter()
+
+    async def _on_queued_end(self, session, context, params):
+        wait = time.perf_counter() - context.queued_at
+        self.queued += 1
+        self.queue_wait_total += wait
+        self.queue_wait_max = max(self.queue_wait_max, wait)
+
+    async def start(self):
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def stats(self) -> dict:
+        open_connections = idle_connections = 0
+        if self._session is not None and not self._session.closed:
+            connector = self._session.connector
+            # aiohttp keeps no public counters, read the pool directly
+            idle_connections = sum(len(conns) for conns in getattr(connector, "_conns", {}).values())
+            open_connections = len(getattr(connector, "_acquired", ())) + idle_connections
+
+        acquired = self.connections_created + self.connections_reused
+        return {
+            "requests": self.requests,
+            "open_connections": open_connections,
+            "idle_connections": idle_connections,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "reuse_rate": self.connections_reused / acquired if acquired else 0.0,
+            "queued_requests": self.queued,
+            "avg_queue_wait_ms": self.queue_wait_total / self.queued * 1000 if self.queued else 0.0,
+            "max_queue_wait_ms": self.queue_wait_max * 1000
+        }
+
+http_client = HttpClient()
@@ -0,0 +1,217 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import time
+
+# Seconds, from in-process cache lookups to slow upstream calls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Timed stages of a request. Upstream calls are timed under the upstream's
+# name. The list is fixed so a request's timings are a flat list of floats.
+STAGES = (
+    "cache", "google", "youtube", "reddit", "scholar", "serpapi", "huggingface",
+    "youtube_scoring", "summary", "sentiment", "serialize"
+)
+STAGE_INDEX = {stage: i for i, stage in enumerate(STAGES)}
+
+# (labels, value) pairs of one metric family, labels as (name, value) pairs
+Samples = List[Tuple[Tuple[Tuple[str, str], ...], float]]
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+class Histogram:
+    # Counts per bucket are kept non-cumulative so observe() touches a
+    # single slot; they are summed up when rendered
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class MetricFamily:
+    # One metric and its children, one per combination of label values.
+    # Children are created on first use and reused; hot paths keep a
+    # reference to theirs instead of looking it up per call.
+    def __init__(self, name: str, help: str, kind: str, label_names: Tuple[str, ...], factory: Callable):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.label_names = label_names
+        self.factory = factory
+        self.children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        child = self.children.get(values)
+        if child is None:
+            child = self.children[values] = self.factory()
+        return child
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(pairs: Iterable[Tuple[str, str]]) -> str:
+    body = ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs)
+    return f"{{{body}}}" if body else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class MetricsRegistry:
+    # Metrics in the Prometheus text exposition format. Counters and
+    # histograms are updated in place on the hot path; collectors turn the
+    # components' stats() into gauges and counters at scrape time only.
+    def __init__(self):
+        self.families: List[MetricFamily] = []
+        self.collectors: List[Callable[[], Iterable[Tuple[str, str, str, Samples]]]] = []
+
+    def counter(self, name: str, help: str, label_names: Tuple[str, ...] = ()) -> MetricFamily:
+        family = MetricFamily(name, help, "counter", label_names, Counter)
+        self.families.append(family)
+        return family
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        label_names: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    ) -> MetricFamily:
+        family = MetricFamily(name, help, "histogram", label_names, lambda: Histogram(buckets))
+        self.families.append(family)
+        return family
+
+    def collector(self, collect: Callable[[], Iterable[Tuple[str, str, str, Samples]]]):
+        # collect() yields (name, type, help, samples) per metric
+        self.collectors.append(collect)
+        return collect
+
+    def render(self) -> str:
+        lines = []
+        for family in self.families:
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for values, child in list(family.children.items()):
+                labels = tuple(zip(family.label_names, values))
+                if family.kind == "histogram":
+                    lines.extend(self._render_histogram(family.name, labels, child))
+                else:
+                    lines.append(f"{family.name}{_format_labels(labels)} {_format_value(child.value)}")
+
+        for collect in self.collectors:
+            try:
+                metrics = list(collect())
+            except Exception as e:
+                print(f"Metrics collector error: {e}")
+                continue
+            for name, kind, help, samples in metrics:
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    if value is not None:
+                        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histogram(name: str, labels: tuple, histogram: Histogram) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+            cumulative += count
+            le = _format_labels(labels + (("le", _format_value(bound)),))
+            lines.append(f"{name}_bucket{le} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+        lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return lines
+
+metrics = MetricsRegistry()
+
+stage_seconds = metrics.histogram(
+    "neuraseek_stage_seconds",
+    "Time spent per request stage; upstream stages time single attempts",
+    ("stage",)
+)
+# Preallocated, recording a stage is a list index and a bisect
+_stage_histograms = [stage_seconds.labels(stage) for stage in STAGES]
+
+class RequestTiming:
+    # Per-request stage totals for the Server-Timing header. Concurrent
+    # stages (federated upstream calls) add up, so a stage can exceed the
+    # wall time of the request.
+    __slots__ = ("started", "durations")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = [0.0] * len(STAGES)
+
+    def header(self) -> str:
+        entries = [
+            f"{stage};dur={seconds * 1000:.1f}"
+            for stage, seconds in zip(STAGES, self.durations) if seconds
+        ]
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(entries)
+
+_request_timing: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+def record_stage(stage: str, seconds: float):
+    index = STAGE_INDEX.get(stage)
+    if index is None:
+        return
+    _stage_histograms[index].observe(seconds)
+    timing = _request_timing.get()
+    if timing is not None:
+        timing.durations[index] += seconds
+
+@contextmanager
+def span(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+class ServerTimingMiddleware:
+    # Adds a Server-Timing header with the request's stage totals, shown by
+    # the browser's network panel. Plain ASGI so the request timing set here
+    # is the one the endpoint's context sees.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming()
+        token = _request_timing.set(timing)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timing.header().encode("latin-1")))
+                # Lets a frontend on another origin read it through the Performance API
+                headers.append((b"timing-allow-origin", b"*"))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timing.reset(token)
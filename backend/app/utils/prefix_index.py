@@ -0,0 +1,133 @@
+from typing import Dict, List, Optional
+import bisect
+import heapq
+import json
+import math
+import os
+import time
+from .cache import normalize_query
+
+class PrefixIndex:
+    # Sorted-array prefix index of past queries and suggestions. Every prefix
+    # maps to a contiguous slice of the sorted keys, found with two bisects.
+    #
+    # Scores decay with a half-life. Instead of touching every entry as time
+    # passes, each increment is scaled up by 2^(age / half_life) relative to a
+    # fixed epoch, so comparing stored scores compares decayed scores.
+    def __init__(
+        self,
+        half_life: float = 7 * 86400,
+        max_entries: int = 200000,
+        max_scan: int = 5000,
+        top_k: int = 5
+    ):
+        self.half_life = half_life
+        self.max_entries = max_entries
+        self.max_scan = max_scan
+        self.top_k = top_k
+        self.epoch = time.time()
+
+        self._keys: List[str] = []
+        self._scores: Dict[str, float] = {}
+        self._display: Dict[str, str] = {}
+        # Top suggestions per looked-up prefix, dropped when an entry under it changes
+        self._top: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _boost(self, now: float) -> float:
+        exponent = (now - self.epoch) / self.half_life
+        if exponent > 500:
+            self._rebase(now)
+            exponent = 0.0
+        return math.pow(2.0, exponent)
+
+    def _rebase(self, now: float):
+        factor = math.pow(2.0, -(now - self.epoch) / self.half_life)
+        self._scores = {key: score * factor for key, score in self._scores.items()}
+        self.epoch = now
+
+    def add(self, text: str, weight: float = 1.0, now: Optional[float] = None):
+        key = normalize_query(text)
+        if not key:
+            return
+
+        if key not in self._scores:
+            bisect.insort(self._keys, key)
+            self._scores[key] = 0.0
+            self._display[key] = text.strip()
+        self._scores[key] += weight * self._boost(now if now is not None else time.time())
+
+        for end in range(1, len(key) + 1):
+            self._top.pop(key[:end], None)
+        if len(self._keys) > self.max_entries:
+            self._prune()
+
+    def _prune(self):
+        # Drop the weakest tenth of the index
+        keep = heapq.nlargest(int(self.max_entries * 0.9), self._keys, key=self._scores.__getitem__)
+        keep_set = set(keep)
+        self._keys = sorted(keep)
+        self._scores = {key: self._scores[key] for key in keep}
+        self._display = {key: value for key, value in self._display.items() if key in keep_set}
+        self._top.clear()
+
+    def lookup(self, prefix: str, limit: Optional[int] = None) -> List[str]:
+        prefix = normalize_query(prefix)
+        limit = limit or self.top_k
+        if not prefix:
+            return []
+
+        cached = self._top.get(prefix) if limit == self.top_k else None
+        if cached is not None:
+            return cached
+
+        start = bisect.bisect_left(self._keys, prefix)
+        end = bisect.bisect_left(self._keys, prefix + "\U0010ffff", lo=start)
+        if end - start > self.max_scan:
+            end = start + self.max_scan
+
+        candidates = self._keys[start:end]
+        top = [self._display[key] for key in heapq.nlargest(limit, candidates, key=self._scores.__getitem__)]
+        if limit == self.top_k:
+            if len(self._top) >= self.max_entries:
+                self._top.clear()
+            self._top[prefix] = top
+        return top
+
+    def snapshot(self, path: str):
+        data = {
+            "epoch": self.epoch,
+            "half_life": self.half_life,
+            "entries": [[key, self._display[key], self._scores[key]] for key in self._keys]
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> bool:
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not load prefix index snapshot: {e}")
+            return False
+
+        # Snapshots are written in key order, so no re-sorting is needed
+        entries = data.get("entries", [])
+        self.epoch = data.get("epoch", self.epoch)
+        self._keys = [key for key, _, _ in entries]
+        self._display = {key: display for key, display, _ in entries}
+        self._scores = {key: score for key, _, score in entries}
+        self._top.clear()
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._keys),
+            "cached_prefixes": len(self._top)
+        }
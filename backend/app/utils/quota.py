@@ -0,0 +1,157 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional
+import time
+from ..config import settings
+from .resilience import LocalRejection, get_upstream
+
+# Lowest number first: under quota pressure speculative work (prefetch, cache
+# refreshes) stops first, then enrichments (channel stats, AI), then core results
+PRIORITIES = {"core": 0, "enrichment": 1, "speculative": 2}
+
+_priority: ContextVar[str] = ContextVar("upstream_priority", default="core")
+
+@contextmanager
+def upstream_priority(priority: str):
+    # Every upstream call made inside the block, including tasks it starts,
+    # is scheduled at this priority or lower
+    token = _priority.set(_lowest(_priority.get(), priority))
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def current_priority() -> str:
+    return _priority.get()
+
+def _lowest(*priorities: Optional[str]) -> str:
+    return max((p for p in priorities if p), key=PRIORITIES.__getitem__)
+
+class QuotaExceededError(LocalRejection):
+    def __init__(self, provider: str, priority: str, reason: str):
+        super().__init__(f"{provider} quota: {reason} for {priority} calls")
+        self.provider = provider
+        self.priority = priority
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self, amount: float, keep: float = 0.0) -> bool:
+        # keep: tokens that must remain afterwards, held back for higher priorities
+        self.refill()
+        if self.tokens - amount < keep:
+            return False
+        self.tokens -= amount
+        return True
+
+class ProviderQuota:
+    # A provider's quota of `limit` units per `period` seconds. The hard limit
+    # is counted per fixed window (aligned to UTC, so daily windows reset at
+    # midnight UTC). A token bucket refilling at limit / period paces spending
+    # across the window, so a spike cannot burn the whole day's quota.
+    def __init__(self, provider: str, limit: int, period: float, burst: float, reserves: Dict[str, float]):
+        self.provider = provider
+        self.limit = limit
+        self.period = period
+        self.bucket = TokenBucket(rate=limit / period, capacity=max(1.0, limit * burst))
+        self.reserves = reserves
+
+        self.window_start = self._window(time.time())
+        self.used = 0
+        self.costs: Dict[str, int] = {}
+        self.denied = {priority: 0 for priority in PRIORITIES}
+
+    def _window(self, now: float) -> float:
+        return now - now % self.period
+
+    def acquire(self, call_type: str, cost: int, priority: str):
+        window = self._window(time.time())
+        if window != self.window_start:
+            self.window_start, self.used = window, 0
+
+        reserve = self.reserves.get(priority, 0.0)
+        if self.used + cost > self.limit * (1 - reserve):
+            self.denied[priority] += 1
+            raise QuotaExceededError(self.provider, priority, "period budget spent")
+        if not self.bucket.try_take(cost, keep=self.bucket.capacity * reserve):
+            self.denied[priority] += 1
+            raise QuotaExceededError(self.provider, priority, "rate limited")
+
+        self.used += cost
+        self.costs[call_type] = self.costs.get(call_type, 0) + cost
+
+    def admitted(self) -> list:
+        # Priorities that would currently get a unit-cost call through
+        self.bucket.refill()
+        return [
+            priority for priority, reserve in self.reserves.items()
+            if self.used + 1 <= self.limit * (1 - reserve)
+            and self.bucket.tokens - 1 >= self.bucket.capacity * reserve
+        ]
+
+    def stats(self) -> dict:
+        self.bucket.refill()
+        return {
+            "limit": self.limit,
+            "period_seconds": self.period,
+            "used": self.used,
+            "remaining": max(0, self.limit - self.used),
+            "resets_in_seconds": self.window_start + self.period - time.time(),
+            "bucket_tokens": round(self.bucket.tokens, 2),
+            "bucket_capacity": self.bucket.capacity,
+            "admitted_priorities": self.admitted(),
+            "denied": dict(self.denied),
+            "cost_by_call": dict(self.costs)
+        }
+
+class QuotaScheduler:
+    # Single entry point for upstream calls: charges the provider's quota by
+    # call type and priority, then runs the call through the provider's
+    # circuit breaker, timeout and retry policy. Providers without a
+    # configured quota only get the latter.
+    def __init__(self):
+        self.costs = settings.QUOTA_COSTS
+        reserves = {
+            priority: settings.QUOTA_PRIORITY_RESERVES.get(priority, 0.0)
+            for priority in PRIORITIES
+        }
+        self.quotas = {
+            provider: ProviderQuota(provider, int(limit), float(period), settings.QUOTA_BURST, reserves)
+            for provider, (limit, period) in settings.QUOTA_LIMITS.items()
+        }
+
+    async def call(
+        self,
+        provider: str,
+        call_type: str,
+        fn: Callable[[], Awaitable[Any]],
+        priority: Optional[str] = None,
+        retry: bool = False
+    ) -> Any:
+        quota = self.quotas.get(provider)
+        if quota is None:
+            return await get_upstream(provider).call(fn, retry=retry)
+
+        priority = _lowest(_priority.get(), priority)
+        cost = self.costs.get(f"{provider}.{call_type}", 1)
+
+        async def charged():
+            # Charged per attempt, upstreams bill retries too
+            quota.acquire(call_type, cost, priority)
+            return await fn()
+
+        return await get_upstream(provider).call(charged, retry=retry)
+
+    def stats(self) -> dict:
+        return {provider: quota.stats() for provider, quota in self.quotas.items()}
+
+quota_scheduler = QuotaScheduler()
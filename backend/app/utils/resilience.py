@@ -0,0 +1,200 @@
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import random
+import time
+import aiohttp
+from ..config import settings
+from .metrics import record_stage
+
+class LocalRejection(Exception):
+    # Raised before a request left the process; says nothing about the
+    # upstream's health and is never retried
+    pass
+
+class CircuitOpenError(LocalRejection):
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} circuit is open, retry in {retry_in:.1f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+def _status(exc: BaseException) -> Optional[int]:
+    # aiohttp and GoogleApiError carry .status, asyncprawcore keeps the response
+    status = getattr(exc, "status", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status", None)
+    return status if isinstance(status, int) else None
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (asyncio.TimeoutError, aiohttp.ClientConnectionError)):
+        return True
+    original = getattr(exc, "original_exception", None)
+    if isinstance(original, BaseException):
+        return is_retryable(original)
+    status = _status(exc)
+    return status is not None and (status >= 500 or status == 429)
+
+def is_failure(exc: BaseException) -> bool:
+    # A malformed request says nothing about the upstream's health; auth,
+    # quota and rate-limit errors do, since every following call fails too
+    status = _status(exc)
+    return not (status is not None and 400 <= status < 500 and status not in (401, 403, 429))
+
+class CircuitBreaker:
+    # closed: calls go through, consecutive failures are counted
+    # open: calls fail immediately until reset_timeout has passed
+    # half_open: one probe call decides between closed and open again
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+        self.opened = 0
+        self.rejected = 0
+
+    def before_call(self):
+        if self.state == "closed":
+            return
+        if self.state == "open":
+            retry_in = self.opened_at + self.reset_timeout - time.monotonic()
+            if retry_in > 0:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, retry_in)
+            self.state = "half_open"
+        # Half open: let a single probe through
+        if self.probing:
+            self.rejected += 1
+            raise CircuitOpenError(self.name, 0.0)
+        self.probing = True
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.probing = False
+        self.state = "closed"
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self.probing = False
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                self.opened += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        # A probe that ended without a verdict (cancelled) frees the slot
+        self.probing = False
+
+class LatencyTracker:
+    # Recent successful call latencies; the timeout follows their tail
+    def __init__(self, window: int = 200, recompute_every: int = 20):
+        self.samples = deque(maxlen=window)
+        self.recompute_every = recompute_every
+        self._since_recompute = 0
+        self._percentiles = {}
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+        self._since_recompute += 1
+        if self._since_recompute >= self.recompute_every:
+            self._percentiles = {}
+            self._since_recompute = 0
+
+    def percentile(self, q: float) -> Optional[float]:
+        if len(self.samples) < self.recompute_every:
+            return None
+        if q not in self._percentiles:
+            ordered = sorted(self.samples)
+            self._percentiles[q] = ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+        return self._percentiles[q]
+
+class Upstream:
+    # Circuit breaker, adaptive timeout and bounded retries around every call
+    # to one upstream source
+    def __init__(self, name: str, max_timeout: float):
+        self.name = name
+        self.max_timeout = max_timeout
+        self.min_timeout = settings.UPSTREAM_MIN_TIMEOUT
+        self.timeout_multiplier = settings.UPSTREAM_TIMEOUT_MULTIPLIER
+        self.max_retries = settings.UPSTREAM_MAX_RETRIES
+        self.retry_backoff = settings.UPSTREAM_RETRY_BACKOFF
+        self.breaker = CircuitBreaker(
+            name,
+            failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.CIRCUIT_RESET_TIMEOUT
+        )
+        self.latency = LatencyTracker()
+
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.retries = 0
+
+    def timeout(self) -> float:
+        # Until enough calls were seen the configured ceiling applies
+        p99 = self.latency.percentile(99)
+        if p99 is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, p99 * self.timeout_multiplier))
+
+    async def call(self, fn: Callable[[], Awaitable[Any]], retry: bool = False) -> Any:
+        # retry: only for idempotent calls; failures are retried with full
+        # jitter backoff while the circuit stays closed
+        attempts = 1 + (self.max_retries if retry else 0)
+        for attempt in range(attempts):
+            self.breaker.before_call()
+            self.calls += 1
+            started = time.monotonic()
+            try:
+                result = await asyncio.wait_for(fn(), self.timeout())
+            except (asyncio.CancelledError, LocalRejection):
+                self.breaker.release()
+                raise
+            except Exception as e:
+                record_stage(self.name, time.monotonic() - started)
+                if isinstance(e, asyncio.TimeoutError):
+                    self.timeouts += 1
+                if not is_failure(e):
+                    self.breaker.record_success()
+                    raise
+                self.failures += 1
+                self.breaker.record_failure()
+                if attempt + 1 >= attempts or not is_retryable(e) or self.breaker.state != "closed":
+                    raise
+                self.retries += 1
+                await asyncio.sleep(random.uniform(0, self.retry_backoff * 2 ** attempt))
+            else:
+                elapsed = time.monotonic() - started
+                self.latency.record(elapsed)
+                record_stage(self.name, elapsed)
+                self.breaker.record_success()
+                return result
+
+    def stats(self) -> dict:
+        p50, p99 = self.latency.percentile(50), self.latency.percentile(99)
+        return {
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "times_opened": self.breaker.opened,
+            "rejected": self.breaker.rejected,
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "retries": self.retries,
+            "timeout_ms": self.timeout() * 1000,
+            "p50_ms": p50 * 1000 if p50 is not None else None,
+            "p99_ms": p99 * 1000 if p99 is not None else None
+        }
+
+upstreams: Dict[str, Upstream] = {}
+
+def get_upstream(name: str) -> Upstream:
+    upstream = upstreams.get(name)
+    if upstream is None:
+        upstream = Upstream(name, settings.UPSTREAM_MAX_TIMEOUTS.get(name, settings.UPSTREAM_TIMEOUT))
+        upstreams[name] = upstream
+    return upstream
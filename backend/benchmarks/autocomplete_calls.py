@@ -0,0 +1,128 @@
+"""Counts outbound SerpAPI calls per typed query for /suggestions.
+
+Every distinct query in the log is typed by its own client, one keystroke at a
+time with random pauses. Keystrokes followed by a pause longer than the
+frontend debounce send a request. The same requests are replayed against the
+exact-key cache alone (before) and the full suggestion path with prefix reuse
+and per-client debouncing (after), with a fake SerpAPI behind both.
+
+    cd backend && python -m benchmarks.autocomplete_calls [--client-debounce 0.3]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+
+from aiohttp import web
+
+DEFAULT_LOG = os.path.join(os.path.dirname(__file__), "fixtures", "query_log.jsonl")
+SUFFIXES = ["", " for beginners", " examples", " course", " pdf", " 2024", " reddit",
+            " interview questions", " vs", " news", " explained", " near me"]
+
+
+def load_queries(path):
+    from app.utils.cache import normalize_query
+    queries = {}
+    with open(path, encoding="utf-8") as log:
+        for line in log:
+            if line.strip():
+                q = json.loads(line)["q"]
+                queries.setdefault(normalize_query(q), q)
+    return sorted(queries)
+
+
+def typing_sessions(queries, client_debounce, seed):
+    # Returns (client, delay since previous request, prefix) per sent request
+    rng = random.Random(seed)
+    sessions = []
+    for client, query in enumerate(queries):
+        # Pause after each keystroke; the last one is followed by no keystroke
+        pauses = [rng.uniform(0.05, 0.45) for _ in query[1:]] + [float("inf")]
+        requests, elapsed = [], 0.0
+        for end, pause in enumerate(pauses, start=1):
+            if pause > client_debounce:
+                requests.append((elapsed + min(pause, client_debounce), query[:end]))
+            elapsed += pause
+        sessions.append((client, requests))
+    return sessions
+
+
+async def start_fake_serpapi(vocabulary, latency, calls) -> web.AppRunner:
+    async def autocomplete(request):
+        calls.append(request.query["q"])
+        await asyncio.sleep(latency)
+        prefix = request.query["q"].lower()
+        matches = [{"value": phrase} for phrase in vocabulary if phrase.startswith(prefix)][:10]
+        return web.json_response({"suggestions": matches})
+
+    app = web.Application()
+    app.router.add_get("/search", autocomplete)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 8766).start()
+    return runner
+
+
+async def replay(sessions, send):
+    async def run_client(client, requests):
+        started = asyncio.get_running_loop().time()
+        pending = []
+        for at, prefix in requests:
+            await asyncio.sleep(max(0.0, started + at - asyncio.get_running_loop().time()))
+            # Requests are not awaited in order, like a browser firing fetches
+            pending.append(asyncio.ensure_future(send(client, prefix)))
+        await asyncio.gather(*pending)
+
+    await asyncio.gather(*[run_client(client, requests) for client, requests in sessions])
+
+
+async def main(path, client_debounce, latency, seed):
+    for key in ("GOOGLE_API_KEY", "GOOGLE_CX_ID", "YOUTUBE_API_KEY", "REDDIT_CLIENT_ID",
+                "REDDIT_CLIENT_SECRET", "SERPAPI_KEY", "HUGGINGFACE_API_KEY"):
+        os.environ.setdefault(key, "benchmark")
+
+    from app.services.autocomplete_service import AutocompleteService
+    from app.utils import cache
+    from app.utils.cache_backends import create_cache_backend
+    from app.utils.http import http_client
+
+    queries = load_queries(path)
+    vocabulary = sorted(query + suffix for query in queries for suffix in SUFFIXES)
+    sessions = typing_sessions(queries, client_debounce, seed)
+    sent = sum(len(requests) for _, requests in sessions)
+
+    calls = []
+    runner = await start_fake_serpapi(vocabulary, latency, calls)
+    try:
+        results = {}
+        for label in ("before", "after"):
+            calls.clear()
+            # Each run starts cold
+            cache.search_cache = create_cache_backend()
+            service = AutocompleteService()
+            service.base_url = "http://127.0.0.1:8766/search"
+
+            if label == "before":
+                send = lambda client, prefix: service.fetch_suggestions(prefix)
+            else:
+                send = lambda client, prefix: service.get_suggestions(prefix, client=client)
+            await replay(sessions, send)
+            results[label] = len(calls)
+    finally:
+        await http_client.close()
+        await runner.cleanup()
+
+    print(f"{len(queries)} queries typed, {sent} /suggestions requests sent")
+    for label, count in results.items():
+        print(f"{label:>6}: {count} SerpAPI calls, {count / len(queries):.2f} per typed query")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("log", nargs="?", default=DEFAULT_LOG)
+    parser.add_argument("--client-debounce", type=float, default=0.3)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(main(args.log, args.client_debounce, args.latency, args.seed))
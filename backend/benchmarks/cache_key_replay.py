@@ -0,0 +1,92 @@
+"""Replays a recorded /search query log and compares cache hit rates of the
+legacy `name:args:kwargs` keys against the normalized cache keys.
+
+Each log line is a JSON object with the /search parameters (q, type, page,
+page_size, page_token). Entries are assumed to fall within the cache TTL.
+
+    cd backend && python -m benchmarks.cache_key_replay [benchmarks/fixtures/query_log.jsonl]
+"""
+import json
+import math
+import os
+import sys
+
+for key in ("GOOGLE_API_KEY", "GOOGLE_CX_ID", "YOUTUBE_API_KEY", "REDDIT_CLIENT_ID",
+            "REDDIT_CLIENT_SECRET", "SERPAPI_KEY", "HUGGINGFACE_API_KEY"):
+    os.environ.setdefault(key, "benchmark")
+
+from app.services.google_search import GoogleSearchService
+from app.services.reddit_search import RedditSearchService
+from app.services.scholar_search import ScholarSearchService
+from app.services.youtube_search import YouTubeSearchService
+from app.utils.cache import make_cache_key
+from app.utils.cursor import decode_cursor
+
+DEFAULT_LOG = os.path.join(os.path.dirname(__file__), "fixtures", "query_log.jsonl")
+
+
+def google_chunk_calls(google, q, search_type, page, page_size):
+    # GoogleSearchService.search_or_raise is not cached itself, it cuts pages
+    # from the cached fetch_chunk calls covering them
+    first = (page - 1) * page_size
+    last = min(first + page_size, google.MAX_RESULTS)
+    for offset in range(first - first % google.CHUNK_SIZE, last, google.CHUNK_SIZE):
+        yield google, google.fetch_chunk, (q,), {"search_type": search_type, "offset": offset}
+
+
+def service_calls(entry, services):
+    # Mirrors the cached calls api/search.py ends up making for a request
+    google, youtube, reddit, scholar = services
+    q = entry["q"]
+    page = entry.get("page", 1)
+    page_size = entry.get("page_size", 20)
+    page_token = entry.get("page_token")
+    search_type = entry.get("type", "all")
+    if search_type == "all":
+        # FederatedSearchService: every source gets its share of the page,
+        # YouTube only on the first page or when the cursor carries its token
+        cursors = decode_cursor(page_token) or {}
+        limit = max(1, math.ceil(page_size / 4))
+        yield from google_chunk_calls(google, q, None, page, limit)
+        if page == 1 or cursors.get("videos"):
+            yield youtube, youtube.search_or_raise, (q,), {"page_token": cursors.get("videos"), "page_size": limit}
+        yield reddit, reddit.search_or_raise, (q,), {"limit": limit, "page": page, "cursor": cursors.get("discussions")}
+        yield scholar, scholar.search_or_raise, (q,), {"limit": limit, "page": page, "cursor": cursors.get("papers")}
+    elif search_type == "images":
+        yield from google_chunk_calls(google, q, "images", page, page_size)
+    elif search_type == "videos":
+        yield youtube, youtube.search_or_raise, (q,), {"page_token": page_token, "page_size": page_size}
+    elif search_type == "discussions":
+        yield reddit, reddit.search_or_raise, (q,), {"limit": page_size, "page": page, "cursor": page_token}
+    elif search_type == "papers":
+        yield scholar, scholar.search_or_raise, (q,), {"limit": page_size, "page": page, "cursor": page_token}
+
+
+def main(path):
+    services = (GoogleSearchService(), YouTubeSearchService(), RedditSearchService(), ScholarSearchService())
+    legacy_keys, normalized_keys = set(), set()
+    legacy_hits = normalized_hits = total = 0
+
+    with open(path, encoding="utf-8") as log:
+        for line in log:
+            if not line.strip():
+                continue
+            for service, method, args, kwargs in service_calls(json.loads(line), services):
+                func = method.__wrapped__
+                total += 1
+
+                legacy_key = f"{func.__name__}:{str((service,) + args)}:{str(kwargs)}"
+                legacy_hits += legacy_key in legacy_keys
+                legacy_keys.add(legacy_key)
+
+                normalized_key = make_cache_key(func, (service,) + args, kwargs, method.key_params)
+                normalized_hits += normalized_key in normalized_keys
+                normalized_keys.add(normalized_key)
+
+    print(f"{total} cached calls replayed")
+    print(f"legacy keys:     {legacy_hits} hits ({legacy_hits / total:.1%}), {len(legacy_keys)} distinct keys")
+    print(f"normalized keys: {normalized_hits} hits ({normalized_hits / total:.1%}), {len(normalized_keys)} distinct keys")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_LOG)
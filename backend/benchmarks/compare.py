@@ -0,0 +1,91 @@
+"""Compares two benchmark results files and flags regressions.
+
+Both files must come from the same suite (load_test or micro). For each case
+present in both, latency percentiles (_ms/_ns, lower is better), throughput
+(_per_s, higher is better) and the error rate are compared. A change worse than
+--threshold percent is a regression and makes the exit status 1, so the
+comparison can gate CI. Tail percentiles of short runs are noisy; compare runs
+of the same length on the same machine and prefer --metrics p50,p95 there.
+
+    cd backend && python -m benchmarks.compare before.json after.json --threshold 10
+"""
+import argparse
+import sys
+
+from benchmarks.report import format_value, load_results
+
+
+def direction(metric):
+    # 1 when larger is better, -1 when smaller is better, None to skip
+    if metric.endswith("_per_s"):
+        return 1
+    if metric.endswith(("_ms", "_ns")) or metric == "error_rate":
+        return -1
+    return None
+
+
+def compare(baseline, candidate, metrics, threshold):
+    rows = []
+    for name in baseline:
+        if name not in candidate:
+            continue
+        for metric, before in baseline[name].items():
+            after = candidate[name].get(metric)
+            better = direction(metric)
+            if better is None or before is None or after is None:
+                continue
+            if metrics and not any(metric.startswith(prefix) for prefix in metrics):
+                continue
+
+            if metric == "error_rate":
+                # Absolute change in percentage points, the rate is often 0
+                change = (after - before) * 100
+            else:
+                change = (after - before) / before * 100 if before else 0.0
+            regressed = -better * change > threshold
+            improved = better * change > threshold
+            rows.append((name, metric, before, after, change, regressed, improved))
+    return rows
+
+
+def main(args):
+    baseline, candidate = load_results(args.baseline), load_results(args.candidate)
+    if baseline["suite"] != candidate["suite"]:
+        sys.exit(f"Cannot compare a {baseline['suite']} run with a {candidate['suite']} run")
+
+    for label, results in (("baseline", baseline), ("candidate", candidate)):
+        meta = results["meta"]
+        print(f"{label:>9}: {meta.get('revision') or 'unknown'} at {meta.get('timestamp')}")
+
+    before_args, after_args = baseline["meta"].get("args", {}), candidate["meta"].get("args", {})
+    changed = sorted(key for key in before_args.keys() | after_args.keys() if before_args.get(key) != after_args.get(key))
+    if changed:
+        print(f"Warning: runs used different arguments ({', '.join(changed)})")
+
+    metrics = args.metrics.split(",") if args.metrics else None
+    rows = compare(baseline["results"], candidate["results"], metrics, args.threshold)
+    width = max([len(f"{name} {metric}") for name, metric, *_ in rows] + [10])
+    regressions = 0
+    for name, metric, before, after, change, regressed, improved in rows:
+        if args.only_changes and not (regressed or improved):
+            continue
+        verdict = "REGRESSION" if regressed else "improved" if improved else ""
+        unit = "pp" if metric == "error_rate" else "%"
+        print(f"{name + ' ' + metric:<{width}}  {format_value(before):>12}  {format_value(after):>12}  {change:>+8.1f}{unit:<2}  {verdict}")
+        regressions += regressed
+
+    missing = sorted(set(baseline["results"]) ^ set(candidate["results"]))
+    if missing:
+        print(f"Only in one run: {', '.join(missing)}")
+    print(f"{regressions} regression(s) beyond {args.threshold:g}%")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Percent change that counts")
+    parser.add_argument("--metrics", help="Comma-separated metric prefixes, e.g. p50,p95,throughput")
+    parser.add_argument("--only-changes", action="store_true", help="Hide rows within the threshold")
+    sys.exit(main(parser.parse_args()))
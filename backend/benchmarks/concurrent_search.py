@@ -0,0 +1,76 @@
+"""Checks that concurrent /search requests overlap their upstream waits.
+
+Starts a fake Custom Search endpoint with a fixed latency, points the app at it
+and fires N parallel /search requests. With a non-blocking transport the whole
+batch finishes in roughly one upstream latency instead of N.
+
+    cd backend && python -m benchmarks.concurrent_search --requests 20 --latency 0.5
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from aiohttp import web
+
+
+async def start_fake_google(latency: float) -> web.AppRunner:
+    async def custom_search(request):
+        await asyncio.sleep(latency)
+        start = int(request.query.get("start", 1))
+        num = int(request.query.get("num", 10))
+        items = [
+            {
+                "link": f"https://example.com/{request.query['q']}/{i}",
+                "title": f"Result {i}",
+                "snippet": "Lorem ipsum",
+                "displayLink": "www.example.com",
+            }
+            for i in range(start, start + num)
+        ]
+        return web.json_response({"items": items, "searchInformation": {"totalResults": "1000"}})
+
+    app = web.Application()
+    app.router.add_get("/customsearch/v1", custom_search)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 8765).start()
+    return runner
+
+
+async def main(requests: int, latency: float):
+    os.environ["GOOGLE_API_BASE_URL"] = "http://127.0.0.1:8765"
+    for key in ("GOOGLE_API_KEY", "GOOGLE_CX_ID", "YOUTUBE_API_KEY", "REDDIT_CLIENT_ID",
+                "REDDIT_CLIENT_SECRET", "SERPAPI_KEY", "HUGGINGFACE_API_KEY"):
+        os.environ.setdefault(key, "benchmark")
+
+    import httpx
+    from main import app
+    from app.utils.http import http_client
+
+    runner = await start_fake_google(latency)
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://app") as client:
+            started = time.perf_counter()
+            # Distinct queries so the search cache cannot short-circuit the upstream call
+            responses = await asyncio.gather(*[
+                client.get("/search", params={"q": f"query {i}", "type": "images", "page_size": 10})
+                for i in range(requests)
+            ])
+            elapsed = time.perf_counter() - started
+    finally:
+        await http_client.close()
+        await runner.cleanup()
+
+    ok = sum(1 for r in responses if r.status_code == 200 and r.json()["results"])
+    print(f"{ok}/{requests} requests succeeded in {elapsed:.2f}s "
+          f"(upstream latency {latency:.2f}s, serial would be {requests * latency:.2f}s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.5)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.latency))
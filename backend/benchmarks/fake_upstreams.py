@@ -0,0 +1,291 @@
+"""Local stand-ins for every upstream the backend talks to.
+
+One aiohttp server answers the Custom Search, YouTube Data, SerpAPI
+autocomplete, Hugging Face inference and Reddit (token + search) endpoints
+from the recorded responses in fixtures/upstreams. Items are rewritten per
+query and offset so different queries and pages get distinct results, which
+keeps the app's caches behaving as they would in production.
+
+Each provider has a latency distribution (lognormal around a median) and an
+error rate, answered with a 503. Google Scholar is scraped by scholarly rather
+than called over HTTP, so it is replaced in-process by patch_scholar() with
+the same latency and error model.
+
+Run standalone to point a separately started backend at it:
+
+    cd backend && python -m benchmarks.fake_upstreams --port 8780 --profile scholar=0.8,0.4,0.05
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+from urllib.parse import quote_plus
+
+from aiohttp import web
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "upstreams")
+
+# provider: (median latency in seconds, lognormal sigma, error rate)
+DEFAULT_PROFILES = {
+    "google": (0.25, 0.35, 0.0),
+    "youtube": (0.2, 0.35, 0.0),
+    "serpapi": (0.15, 0.3, 0.0),
+    "reddit": (0.4, 0.5, 0.0),
+    "scholar": (1.2, 0.5, 0.0),
+    "huggingface": (0.35, 0.5, 0.0),
+}
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as fixture:
+        return json.load(fixture)
+
+
+def parse_profiles(specs, scale=1.0):
+    # "provider=median,sigma,error_rate"; missing fields keep their defaults
+    profiles = dict(DEFAULT_PROFILES)
+    for spec in specs or ():
+        provider, _, values = spec.partition("=")
+        if provider not in profiles:
+            raise ValueError(f"Unknown provider: {provider}")
+        fields = list(profiles[provider])
+        for i, value in enumerate(values.split(",")):
+            if value:
+                fields[i] = float(value)
+        profiles[provider] = tuple(fields)
+    return {provider: (median * scale, sigma, errors) for provider, (median, sigma, errors) in profiles.items()}
+
+
+def query_tag(query):
+    return hashlib.blake2b(query.lower().encode(), digest_size=3).hexdigest()
+
+
+class FakeUpstreams:
+    def __init__(self, profiles=None, seed=0):
+        self.profiles = profiles or dict(DEFAULT_PROFILES)
+        self.rng = random.Random(seed)
+        self.calls = {provider: 0 for provider in self.profiles}
+        self.errors = {provider: 0 for provider in self.profiles}
+        self.runner = None
+        self.port = None
+
+        self.google = load_fixture("google_search.json")
+        self.youtube_search = load_fixture("youtube_search.json")
+        self.youtube_videos = load_fixture("youtube_videos.json")
+        self.youtube_channels = load_fixture("youtube_channels.json")
+        self.serpapi = load_fixture("serpapi_autocomplete.json")
+        self.reddit = load_fixture("reddit_search.json")
+        self.scholar = load_fixture("scholar_pubs.json")
+        self.huggingface = load_fixture("huggingface.json")
+
+    def delay(self, provider):
+        median, sigma, _ = self.profiles[provider]
+        return median * self.rng.lognormvariate(0, sigma)
+
+    def fails(self, provider):
+        return self.rng.random() < self.profiles[provider][2]
+
+    async def respond(self, provider, build):
+        self.calls[provider] += 1
+        await asyncio.sleep(self.delay(provider))
+        if self.fails(provider):
+            self.errors[provider] += 1
+            return web.json_response({"error": {"code": 503, "message": "Backend Error"}}, status=503)
+        return web.json_response(build())
+
+    # Google Custom Search
+
+    async def custom_search(self, request):
+        def build():
+            query = request.query["q"]
+            start = int(request.query.get("start", 1))
+            num = int(request.query.get("num", 10))
+            items = self.google["items"]
+            page = []
+            # Custom Search stops at the 100th result
+            for index in range(start - 1, min(start - 1 + num, 100)):
+                item = dict(items[index % len(items)])
+                item["link"] = f"{item['link']}?q={quote_plus(query)}&r={index}"
+                page.append(item)
+            return {**self.google, "items": page}
+        return await self.respond("google", build)
+
+    # YouTube Data API
+
+    async def youtube_search_list(self, request):
+        def build():
+            query = request.query["q"]
+            page = int(request.query.get("pageToken", "p0")[1:] or 0)
+            count = int(request.query.get("maxResults", 5))
+            items = self.youtube_search["items"]
+            tag = query_tag(query)
+            page_items = []
+            for index in range(page * count, (page + 1) * count):
+                item = json.loads(json.dumps(items[index % len(items)]))
+                item["id"]["videoId"] = f"{item['id']['videoId']}.{tag}.{index}"
+                page_items.append(item)
+            # Five pages per query is plenty for infinite scroll
+            next_token = f"p{page + 1}" if page < 4 else None
+            return {**self.youtube_search, "items": page_items, "nextPageToken": next_token}
+        return await self.respond("youtube", build)
+
+    async def youtube_videos_list(self, request):
+        def build():
+            by_id = {item["id"]: item for item in self.youtube_videos["items"]}
+            items = []
+            for video_id in filter(None, request.query.get("id", "").split(",")):
+                item = json.loads(json.dumps(by_id[video_id.split(".")[0]]))
+                item["id"] = video_id
+                items.append(item)
+            return {**self.youtube_videos, "items": items}
+        return await self.respond("youtube", build)
+
+    async def youtube_channels_list(self, request):
+        def build():
+            ids = set(request.query.get("id", "").split(","))
+            return {**self.youtube_channels, "items": [item for item in self.youtube_channels["items"] if item["id"] in ids]}
+        return await self.respond("youtube", build)
+
+    async def youtube(self, request):
+        handlers = {
+            "search": self.youtube_search_list,
+            "videos": self.youtube_videos_list,
+            "channels": self.youtube_channels_list,
+        }
+        return await handlers[request.match_info["resource"]](request)
+
+    # SerpAPI autocomplete
+
+    async def serpapi_search(self, request):
+        def build():
+            query = request.query["q"]
+            recorded = self.serpapi["search_parameters"]["q"]
+            suggestions = [
+                {**item, "value": query + item["value"][len(recorded):]}
+                for item in self.serpapi["suggestions"]
+            ]
+            return {**self.serpapi, "suggestions": suggestions}
+        return await self.respond("serpapi", build)
+
+    # Hugging Face inference
+
+    async def inference(self, request):
+        model = request.match_info["model"]
+        payload = await request.json()
+
+        def build():
+            recorded = self.huggingface[model]
+            if isinstance(payload["inputs"], str):
+                return recorded
+            return [recorded[0] for _ in payload["inputs"]]
+        return await self.respond("huggingface", build)
+
+    # Reddit
+
+    async def reddit_token(self, request):
+        return web.json_response({"access_token": "benchmark", "token_type": "bearer", "expires_in": 86400, "scope": "*"})
+
+    async def reddit_search(self, request):
+        def build():
+            query = request.query["q"]
+            limit = int(request.query.get("limit", 25))
+            after = request.query.get("after")
+            start = int(after.rsplit("_", 1)[1]) + 1 if after else 0
+            children = self.reddit["data"]["children"]
+            tag = query_tag(query)
+            page = []
+            for index in range(start, start + limit):
+                child = json.loads(json.dumps(children[index % len(children)]))
+                data = child["data"]
+                data["id"] = f"{data['id']}{tag}{index}"
+                data["name"] = f"t3_{tag}_{index}"
+                data["permalink"] = data["permalink"].replace(f"/comments/{children[index % len(children)]['data']['id']}/", f"/comments/{data['id']}/")
+                page.append(child)
+            return {"kind": "Listing", "data": {**self.reddit["data"], "children": page, "after": page[-1]["data"]["name"], "dist": len(page)}}
+        return await self.respond("reddit", build)
+
+    # Google Scholar, in-process
+
+    def patch_scholar(self):
+        from app.services import scholar_search
+
+        fake = self
+
+        def fetch(session, offset, limit):
+            # Blocking like scholarly; runs in the worker thread the service uses
+            fake.calls["scholar"] += 1
+            time.sleep(fake.delay("scholar"))
+            if fake.fails("scholar"):
+                fake.errors["scholar"] += 1
+                raise RuntimeError("Cannot Fetch from Google Scholar.")
+            papers = []
+            for index in range(offset, offset + limit):
+                paper = json.loads(json.dumps(fake.scholar[index % len(fake.scholar)]))
+                paper["pub_url"] = f"{paper['pub_url']}?q={quote_plus(session.query)}&r={index}"
+                papers.append(paper)
+            return papers
+
+        scholar_search.ScholarSession.fetch = fetch
+
+    # Server
+
+    def env(self):
+        # Settings that point the backend at this server
+        base = f"http://127.0.0.1:{self.port}"
+        return {
+            "GOOGLE_API_BASE_URL": base,
+            "SERPAPI_URL": f"{base}/serpapi/search",
+            "HUGGINGFACE_API_URL": f"{base}/models",
+            "REDDIT_URL": base,
+            "REDDIT_OAUTH_URL": base,
+        }
+
+    async def start(self, port=8780):
+        app = web.Application()
+        app.router.add_get("/customsearch/v1", self.custom_search)
+        app.router.add_get("/youtube/v3/{resource}", self.youtube)
+        app.router.add_get("/serpapi/search", self.serpapi_search)
+        app.router.add_post("/models/{model:.+}", self.inference)
+        app.router.add_post("/api/v1/access_token", self.reddit_token)
+        app.router.add_get("/r/all/search/", self.reddit_search)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, "127.0.0.1", port).start()
+        self.port = port
+        return self
+
+    async def stop(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    def stats(self):
+        return {provider: {"calls": self.calls[provider], "errors": self.errors[provider]} for provider in self.profiles}
+
+
+async def serve(port, profiles, seed):
+    fake = await FakeUpstreams(profiles, seed).start(port)
+    print("Fake upstreams running; start the backend with:")
+    for key, value in fake.env().items():
+        print(f"  export {key}={value}")
+    print("Google Scholar can only be faked in-process (benchmarks.load_test).")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await fake.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8780)
+    parser.add_argument("--profile", action="append", help="provider=median,sigma,error_rate (repeatable)")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiplies every median latency")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.port, parse_profiles(args.profile, args.latency_scale), args.seed))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,127 @@
+"""Compares the remote and local sentiment inference backends.
+
+Starts a stand-in for the Hugging Face inference API with a configurable
+latency, then pushes the same batches of texts through both backends at a
+fixed concurrency and reports throughput and per-batch latency percentiles.
+Batches bypass the inference cache.
+
+    cd backend && python -m benchmarks.inference_backends --batches 200 --batch-size 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from aiohttp import web
+
+WORDS = ("this is a really good tutorial but the setup was confusing and slow "
+         "i love how clear the examples are thanks for sharing honestly terrible "
+         "docs not helpful at all we propose a novel method with strong results "
+         "lol this is hilarious worried about the risk of failure").split()
+
+
+async def start_fake_inference(latency: float, per_text: float, calls: list = None) -> web.AppRunner:
+    rng = random.Random(0)
+
+    async def infer(request):
+        payload = await request.json()
+        inputs = payload["inputs"]
+        if calls is not None:
+            calls.append(len(inputs))
+        # Base latency with a long tail, plus time proportional to the batch
+        await asyncio.sleep(latency * rng.lognormvariate(0, 0.35) + per_text * len(inputs))
+        labels = ["LABEL_0", "LABEL_1", "LABEL_2"]
+        return web.json_response([
+            [{"label": label, "score": 1 / len(labels)} for label in labels]
+            for _ in inputs
+        ])
+
+    app = web.Application()
+    app.router.add_post("/models/{model:.+}", infer)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 8767).start()
+    return runner
+
+
+def make_batches(batches: int, batch_size: int, seed: int):
+    rng = random.Random(seed)
+    return [
+        [" ".join(rng.choices(WORDS, k=rng.randint(12, 60))) for _ in range(batch_size)]
+        for _ in range(batches)
+    ]
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+async def run(backend, model, batches, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failed = 0
+
+    async def one(texts):
+        nonlocal failed
+        async with semaphore:
+            started = time.perf_counter()
+            predictions = await backend.infer(model, texts)
+            latencies.append(time.perf_counter() - started)
+            failed += sum(prediction is None for prediction in predictions)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(texts) for texts in batches])
+    return time.perf_counter() - started, latencies, failed
+
+
+async def main(batches, batch_size, concurrency, latency, per_text):
+    for key in ("GOOGLE_API_KEY", "GOOGLE_CX_ID", "YOUTUBE_API_KEY", "REDDIT_CLIENT_ID",
+                "REDDIT_CLIENT_SECRET", "SERPAPI_KEY", "HUGGINGFACE_API_KEY"):
+        os.environ.setdefault(key, "benchmark")
+
+    from app.services.ai_service import AIService
+    from app.utils.http import http_client
+
+    service = AIService()
+    service.base_url = "http://127.0.0.1:8767/models"
+    model = service.overall_sentiment_model
+    work = make_batches(batches, batch_size, seed=1)
+    texts = batches * batch_size
+
+    runner = await start_fake_inference(latency, per_text)
+    local = service._create_backend("local")
+    try:
+        started = time.perf_counter()
+        await local.infer(model, work[0])
+        warmup = time.perf_counter() - started
+
+        results = {
+            "remote": await run(service._create_backend("remote"), model, work, concurrency),
+            "local": await run(local, model, work, concurrency)
+        }
+    finally:
+        await local.close()
+        await http_client.close()
+        await runner.cleanup()
+
+    print(f"{batches} batches of {batch_size} texts, concurrency {concurrency}, "
+          f"stand-in latency {latency * 1000:.0f}ms + {per_text * 1000:.0f}ms/text")
+    print(f"local process pool warm-up: {warmup * 1000:.0f}ms")
+    for name, (elapsed, latencies, failed) in results.items():
+        print(f"{name:>6}: {texts / elapsed:8.0f} texts/s  "
+              f"p50 {percentile(latencies, 50) * 1000:7.1f}ms  "
+              f"p99 {percentile(latencies, 99) * 1000:7.1f}ms  "
+              f"failed {failed}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batches", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.15)
+    parser.add_argument("--per-text", type=float, default=0.005)
+    args = parser.parse_args()
+    asyncio.run(main(args.batches, args.batch_size, args.concurrency, args.latency, args.per_text))
@@ -0,0 +1,230 @@
+"""Load generator for /search and /suggestions.
+
+By default the app runs in-process behind httpx's ASGI transport, with every
+upstream replaced by benchmarks.fake_upstreams, so runs are reproducible and
+never touch the real APIs. Searches replay fixtures/query_log.jsonl; typed
+suggestions are random prefixes of the same queries from a pool of clients.
+
+Closed loop (default): --concurrency clients send back to back. Open loop
+(--rate): requests arrive as a Poisson process whatever the latency, and
+latency is measured from the scheduled arrival so queueing shows up in the
+tail. Requests started during --warmup are not reported. The log is small,
+so most searches are cache hits; --fresh sends that share of searches with a
+never seen query instead. Quotas are lifted unless --keep-quotas is given.
+
+    cd backend && python -m benchmarks.load_test --duration 30 --concurrency 16 --output before.json
+    cd backend && python -m benchmarks.load_test --rate 40 --profile reddit=0.6,0.5,0.02
+    cd backend && python -m benchmarks.compare before.json after.json
+
+With --url the requests go to a running server instead; start
+benchmarks.fake_upstreams and the backend with its settings first.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.fake_upstreams import FakeUpstreams, parse_profiles
+from benchmarks.report import metadata, print_table, summarize_latencies, write_results
+
+DEFAULT_LOG = os.path.join(os.path.dirname(__file__), "fixtures", "query_log.jsonl")
+
+
+def parse_mix(spec):
+    weights = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def load_log(path):
+    with open(path, encoding="utf-8") as log:
+        return [json.loads(line) for line in log if line.strip()]
+
+
+class Workload:
+    def __init__(self, entries, mix, enrich, clients, fresh, seed):
+        self.entries = entries
+        self.names = list(mix)
+        self.weights = [mix[name] for name in self.names]
+        self.enrich = enrich
+        self.clients = clients
+        self.fresh = fresh
+        self.sent = 0
+        self.rng = random.Random(seed)
+
+    def next(self):
+        # Returns (result name, path, params)
+        entry = self.rng.choice(self.entries)
+        if self.rng.choices(self.names, self.weights)[0] == "suggestions":
+            query = entry["q"]
+            prefix = query[:self.rng.randint(1, len(query))]
+            client = f"client-{self.rng.randrange(self.clients)}"
+            return "suggestions", "/suggestions", {"q": prefix, "client": client}
+
+        self.sent += 1
+        query = entry["q"]
+        if self.rng.random() < self.fresh:
+            query = f"{query} {self.sent}"
+        search_type = entry.get("type", "all")
+        params = {
+            "q": query,
+            "type": search_type,
+            "page": entry.get("page", 1),
+            "page_size": entry.get("page_size", 20),
+            "enrich": self.enrich,
+        }
+        return f"search:{search_type}", "/search", params
+
+
+class Recorder:
+    def __init__(self, measure_from):
+        self.measure_from = measure_from
+        self.latencies = {}
+        self.errors = {}
+        self.empty = {}
+
+    def record(self, name, started, latency, ok, empty=False):
+        if started < self.measure_from:
+            return
+        for key in (name, name.split(":")[0]) if ":" in name else (name,):
+            if ok:
+                self.latencies.setdefault(key, []).append(latency)
+            else:
+                self.errors[key] = self.errors.get(key, 0) + 1
+            if empty:
+                self.empty[key] = self.empty.get(key, 0) + 1
+
+    def results(self, duration):
+        results = {}
+        for name in sorted(self.latencies.keys() | self.errors.keys()):
+            summary = summarize_latencies(self.latencies.get(name, []), duration, self.errors.get(name, 0))
+            summary["empty"] = self.empty.get(name, 0)
+            results[name] = summary
+        return results
+
+
+async def send(client, workload, recorder, scheduled=None):
+    name, path, params = workload.next()
+    started = scheduled if scheduled is not None else time.perf_counter()
+    try:
+        response = await client.get(path, params=params)
+        ok = response.status_code == 200
+        empty = ok and path == "/search" and not response.json()["results"]
+    except Exception as e:
+        print(f"Request error: {type(e).__name__}: {e}")
+        ok, empty = False, False
+    recorder.record(name, started, time.perf_counter() - started, ok, empty)
+
+
+async def closed_loop(client, workload, recorder, concurrency, deadline):
+    async def user():
+        while time.perf_counter() < deadline:
+            await send(client, workload, recorder)
+
+    await asyncio.gather(*[user() for _ in range(concurrency)])
+
+
+async def open_loop(client, workload, recorder, rate, deadline, seed):
+    rng = random.Random(seed)
+    tasks = set()
+    scheduled = time.perf_counter()
+    while scheduled < deadline:
+        scheduled += rng.expovariate(rate)
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        task = asyncio.ensure_future(send(client, workload, recorder, scheduled))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks)
+
+
+def configure_app(fake, keep_quotas, state_dir):
+    # Must run before the app is imported; settings are read at import time
+    for key in ("GOOGLE_API_KEY", "GOOGLE_CX_ID", "YOUTUBE_API_KEY", "REDDIT_CLIENT_ID",
+                "REDDIT_CLIENT_SECRET", "SERPAPI_KEY", "HUGGINGFACE_API_KEY"):
+        os.environ.setdefault(key, "benchmark")
+    os.environ.update(fake.env())
+    os.environ["SUGGESTION_INDEX_PATH"] = os.path.join(state_dir, "suggestion_index.json")
+    os.environ["CACHE_SQLITE_PATH"] = os.path.join(state_dir, "cache.sqlite3")
+    # asyncpraw checks PyPI for a newer release on first use otherwise
+    os.environ["praw_check_for_updates"] = "False"
+    if not keep_quotas:
+        os.environ["QUOTA_LIMITS"] = "{}"
+
+
+async def main(args):
+    workload = Workload(
+        load_log(args.query_log), parse_mix(args.mix), args.enrich, args.clients, args.fresh, args.seed
+    )
+    fake = None
+    state_dir = tempfile.TemporaryDirectory()
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+        app = None
+    else:
+        fake = await FakeUpstreams(parse_profiles(args.profile, args.latency_scale), args.seed).start(args.fake_port)
+        configure_app(fake, args.keep_quotas, state_dir.name)
+        from main import app
+        fake.patch_scholar()
+        await app.router.startup()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://app", timeout=60)
+
+    try:
+        started = time.perf_counter()
+        recorder = Recorder(measure_from=started + args.warmup)
+        deadline = started + args.warmup + args.duration
+        print(f"Running for {args.warmup + args.duration:.0f}s ({args.warmup:.0f}s warmup)...")
+        if args.rate:
+            await open_loop(client, workload, recorder, args.rate, deadline, args.seed)
+        else:
+            await closed_loop(client, workload, recorder, args.concurrency, deadline)
+        # Requests still running at the deadline count, stretch the window to them
+        elapsed = max(args.duration, time.perf_counter() - started - args.warmup)
+        results = recorder.results(elapsed)
+    finally:
+        await client.aclose()
+        if app is not None:
+            await app.router.shutdown()
+        if fake is not None:
+            await fake.stop()
+        state_dir.cleanup()
+
+    print_table(results, ["requests", "errors", "empty", "throughput_per_s", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+    if fake is not None:
+        print("Upstream calls: " + ", ".join(
+            f"{provider} {counts['calls']} ({counts['errors']} failed)" for provider, counts in fake.stats().items()
+        ))
+    if args.output:
+        meta = metadata(args)
+        if fake is not None:
+            meta["upstream_calls"] = fake.stats()
+        write_results(args.output, "load", meta, results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="Unreported seconds before measuring")
+    parser.add_argument("--concurrency", type=int, default=16, help="Closed-loop clients")
+    parser.add_argument("--rate", type=float, help="Open-loop arrivals per second")
+    parser.add_argument("--mix", default="search=0.7,suggestions=0.3")
+    parser.add_argument("--enrich", choices=("inline", "deferred"), default="inline")
+    parser.add_argument("--clients", type=int, default=50, help="Distinct /suggestions client ids")
+    parser.add_argument("--fresh", type=float, default=0.0, help="Share of searches with an uncached query")
+    parser.add_argument("--query-log", default=DEFAULT_LOG)
+    parser.add_argument("--profile", action="append", help="provider=median,sigma,error_rate (repeatable)")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiplies every median latency")
+    parser.add_argument("--keep-quotas", action="store_true", help="Enforce the configured upstream quotas")
+    parser.add_argument("--fake-port", type=int, default=8780)
+    parser.add_argument("--url", help="Drive a running server instead of an in-process app")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results as JSON for benchmarks.compare")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,126 @@
+"""Micro-benchmarks for hot-path building blocks.
+
+Each case runs --number calls per sample for --repeat samples after a short
+warmup; the per-call time of every sample feeds p50/p95/p99. Inputs come from
+the upstream fixtures, so scoring and model construction see realistic
+payloads.
+
+    cd backend && python -m benchmarks.micro --output micro.json
+    cd backend && python -m benchmarks.micro --filter cache
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from benchmarks.fake_upstreams import load_fixture
+from benchmarks.report import metadata, percentile, print_table, write_results
+
+for key in ("GOOGLE_API_KEY", "GOOGLE_CX_ID", "YOUTUBE_API_KEY", "REDDIT_CLIENT_ID",
+            "REDDIT_CLIENT_SECRET", "SERPAPI_KEY", "HUGGINGFACE_API_KEY"):
+    os.environ.setdefault(key, "benchmark")
+
+
+def result_fields():
+    # One page of Custom Search results shaped the way GoogleSearchService builds them
+    fields = []
+    for i in range(20):
+        item = load_fixture("google_search.json")["items"][i % 10]
+        fields.append({
+            "id": f"{item['link']}#{i}",
+            "title": item["title"],
+            "description": item["snippet"],
+            "url": item["link"],
+            "thumbnail": item["pagemap"]["cse_thumbnail"][0]["src"],
+            "type": "web",
+            "source_icon": f"https://www.google.com/s2/favicons?domain={item['link']}&sz=32",
+            "source_name": item["displayLink"].replace("www.", ""),
+        })
+    return fields
+
+
+def cases():
+    from app.models.search import SearchResponse, SearchResult
+    from app.services.youtube_search import YouTubeSearchService
+    from app.utils.cache import make_cache_key, normalize_query
+    from app.utils.cache_backends import LRUCache, MemoryBackend
+
+    youtube = YouTubeSearchService()
+    videos = load_fixture("youtube_videos.json")["items"]
+    channels = {channel["id"]: channel for channel in load_fixture("youtube_channels.json")["items"]}
+    fields = result_fields()
+    results = [SearchResult(**values) for values in fields]
+    response = SearchResponse(results=results, total_results=1000, has_more=True)
+
+    cache = LRUCache(ttl_seconds=300, max_entries=2048, max_bytes=64 * 1024 * 1024)
+    keys = [f"key-{i}" for i in range(1024)]
+    for key in keys:
+        cache.set(key, (results, 1000))
+    counter = iter(range(10 ** 12))
+
+    backend = MemoryBackend(LRUCache(ttl_seconds=300, max_entries=2048))
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(backend.set("hit", (results, 1000), ttl=300))
+
+    def score_page():
+        for video in videos:
+            youtube.calculate_video_score(video, "python tutorial for beginners", channels.get(video["snippet"]["channelId"]))
+
+    return {
+        "lru_get_hit": lambda: cache.get(keys[next(counter) % len(keys)]),
+        "lru_get_miss": lambda: cache.get("missing"),
+        "lru_set": lambda: cache.set(f"new-{next(counter) % 4096}", (results, 1000)),
+        "memory_backend_get_entry": lambda: loop.run_until_complete(backend.get_entry("hit")),
+        "make_cache_key": lambda: make_cache_key(
+            youtube.search_or_raise.__wrapped__, (youtube, "Python  Tutorial"), {"page_size": 20}, ("query", "page_token", "page_size")
+        ),
+        "normalize_query": lambda: normalize_query("  Python   Tutorial for ＢＥＧＩＮＮＥＲＳ "),
+        "calculate_video_score_page": score_page,
+        "search_result_construct_page": lambda: [SearchResult(**values) for values in fields],
+        "search_response_dump_json": response.model_dump_json,
+        "search_response_jsonable": lambda: json.dumps(response.model_dump()),
+    }, loop
+
+
+def measure(fn, number, repeat, warmup=0.2):
+    deadline = time.perf_counter() + warmup
+    while time.perf_counter() < deadline:
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - started) / number)
+    return samples
+
+
+def main(args):
+    benchmarks, loop = cases()
+    results = {}
+    try:
+        for name, fn in benchmarks.items():
+            if args.filter and args.filter not in name:
+                continue
+            samples = measure(fn, args.number, args.repeat)
+            results[name] = {
+                "throughput_per_s": len(samples) / sum(samples),
+                **{f"p{q}_ns": percentile(samples, q) * 1e9 for q in (50, 95, 99)},
+                "max_ns": max(samples) * 1e9,
+            }
+    finally:
+        loop.close()
+
+    print_table(results, ["throughput_per_s", "p50_ns", "p95_ns", "p99_ns", "max_ns"])
+    if args.output:
+        write_results(args.output, "micro", metadata(args), results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=200, help="Calls per sample")
+    parser.add_argument("--repeat", type=int, default=200, help="Samples per case")
+    parser.add_argument("--filter", help="Only run cases whose name contains this")
+    parser.add_argument("--output", help="Write results as JSON for benchmarks.compare")
+    main(parser.parse_args())
@@ -0,0 +1,83 @@
+"""Shows AI inference calls being merged across concurrent /search requests.
+
+Simulated requests arrive at random over a short interval and each asks for
+sentiment on its own page of texts. They are run once calling the inference
+backend directly (one upstream call per request) and once through AIService's
+per-model micro-batcher, against the inference stand-in from
+benchmarks.inference_backends. Reports upstream calls, formed batch sizes and
+request latency.
+
+    cd backend && python -m benchmarks.micro_batching --requests 50 --page-size 10
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from benchmarks.inference_backends import make_batches, percentile, start_fake_inference
+
+
+async def run(infer, pages, spread, seed):
+    rng = random.Random(seed)
+    latencies = []
+
+    async def request(texts):
+        await asyncio.sleep(rng.uniform(0, spread))
+        started = time.perf_counter()
+        predictions = await infer(texts)
+        latencies.append(time.perf_counter() - started)
+        assert len(predictions) == len(texts)
+
+    await asyncio.gather(*[request(texts) for texts in pages])
+    return latencies
+
+
+async def main(requests, page_size, spread, latency):
+    for key in ("GOOGLE_API_KEY", "GOOGLE_CX_ID", "YOUTUBE_API_KEY", "REDDIT_CLIENT_ID",
+                "REDDIT_CLIENT_SECRET", "SERPAPI_KEY", "HUGGINGFACE_API_KEY"):
+        os.environ.setdefault(key, "benchmark")
+
+    from app.services.ai_service import AIService
+    from app.utils.http import http_client
+
+    service = AIService()
+    service.base_url = "http://127.0.0.1:8767/models"
+    model = service.sentiment_model
+
+    calls = []
+    runner = await start_fake_inference(latency, per_text=0.002, calls=calls)
+    try:
+        results = {}
+        for label, seed in (("direct", 1), ("batched", 2)):
+            # Distinct texts per run so the inference cache cannot answer
+            pages = [[f"{label} {i} {text}" for text in page]
+                     for i, page in enumerate(make_batches(requests, page_size, seed))]
+            calls.clear()
+            if label == "direct":
+                infer = lambda texts: service.backend.infer(model, texts)
+            else:
+                infer = lambda texts: service._infer_batch(model, texts)
+            latencies = await run(infer, pages, spread, seed)
+            results[label] = (list(calls), latencies)
+    finally:
+        await http_client.close()
+        await runner.cleanup()
+
+    print(f"{requests} requests of {page_size} texts arriving over {spread * 1000:.0f}ms, "
+          f"stand-in latency {latency * 1000:.0f}ms")
+    for label, (batch_sizes, latencies) in results.items():
+        print(f"{label:>8}: {len(batch_sizes):4d} upstream calls, "
+              f"avg batch {sum(batch_sizes) / len(batch_sizes):5.1f}, "
+              f"p50 {percentile(latencies, 50) * 1000:6.1f}ms  p99 {percentile(latencies, 99) * 1000:6.1f}ms")
+    print("batcher:", service.batching_stats()[model])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--spread", type=float, default=0.5)
+    parser.add_argument("--latency", type=float, default=0.15)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.page_size, args.spread, args.latency))
@@ -0,0 +1,174 @@
+"""Checks RedisBackend against a Redis protocol stand-in.
+
+Starts a small in-process server speaking RESP (GET, SET with PX, DEL and the
+handshake redis-py sends) and runs the backend through a round trip of cached
+search results, stale and expired entries, deletes, the tiered L1/L2 setup
+and a server outage, which must be counted as errors rather than raised.
+Pass --url to run the same checks against a real server instead. Exits 1 if
+a check fails.
+
+Needs the redis package (pinned in requirements.txt; RedisBackend.close uses
+aclose(), added in redis-py 5.0.1).
+
+    cd backend && python -m benchmarks.redis_backend [--url redis://localhost:6379/15]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+for key in ("GOOGLE_API_KEY", "GOOGLE_CX_ID", "YOUTUBE_API_KEY", "REDDIT_CLIENT_ID",
+            "REDDIT_CLIENT_SECRET", "SERPAPI_KEY", "HUGGINGFACE_API_KEY"):
+    os.environ.setdefault(key, "benchmark")
+
+
+class RedisStandIn:
+    # Just enough of RESP2 for RedisBackend; values expire lazily on read
+    def __init__(self):
+        self.data = {}
+        self.commands = []
+        self.server = None
+        self.port = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def read_command(self, reader):
+        header = await reader.readline()
+        if not header:
+            return None
+        assert header.startswith(b"*"), header
+        args = []
+        for _ in range(int(header[1:])):
+            length = int((await reader.readline())[1:])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    def execute(self, args):
+        command = args[0].upper().decode()
+        self.commands.append(command)
+        if command in ("CLIENT", "SELECT"):
+            return b"+OK\r\n"
+        if command == "PING":
+            return b"+PONG\r\n"
+        if command == "GET":
+            value, expires_at = self.data.get(args[1], (None, None))
+            if value is None or (expires_at is not None and expires_at <= time.time()):
+                self.data.pop(args[1], None)
+                return b"$-1\r\n"
+            return b"$%d\r\n%s\r\n" % (len(value), value)
+        if command == "SET":
+            options = [arg.upper() for arg in args[3:]]
+            expires_at = None
+            if b"PX" in options:
+                expires_at = time.time() + int(args[3 + options.index(b"PX") + 1]) / 1000
+            self.data[args[1]] = (args[2], expires_at)
+            return b"+OK\r\n"
+        if command == "DEL":
+            removed = sum(self.data.pop(key, None) is not None for key in args[1:])
+            return b":%d\r\n" % removed
+        return b"-ERR unknown command '%s'\r\n" % command.encode()
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                args = await self.read_command(reader)
+                if args is None:
+                    break
+                writer.write(self.execute(args))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def page():
+    from app.models.search import SearchResult
+    results = [
+        SearchResult(id=f"r{i}", title=f"Result {i}", url=f"https://example.com/{i}", type="web",
+                      additional_info={"rank": i, "tags": ["a", "b"]}, relevance_score=i / 10)
+        for i in range(20)
+    ]
+    return results, 1000
+
+
+async def run_checks(url, stand_in):
+    from app.utils.cache_backends import LRUCache, RedisBackend, TieredBackend
+
+    failures = []
+
+    def check(name, condition):
+        print(f"{'PASS' if condition else 'FAIL'}  {name}")
+        if not condition:
+            failures.append(name)
+
+    backend = RedisBackend(url, prefix="neuraseek-check:")
+    value = page()
+
+    await backend.set("page", value, ttl=60)
+    entry = await backend.get_entry("page")
+    check("round trip keeps models and tuples", entry is not None and entry[1] and entry[0] == value)
+    check("miss returns None", await backend.get_entry("missing") is None)
+
+    await backend.set("stale", value, ttl=0.05, stale_ttl=5)
+    await asyncio.sleep(0.1)
+    entry = await backend.get_entry("stale")
+    check("stale entry served as not fresh", entry is not None and not entry[1])
+
+    await backend.set("expired", value, ttl=0.05)
+    await asyncio.sleep(0.1)
+    check("expired entry dropped by the server", await backend.get_entry("expired") is None)
+
+    await backend.delete("page")
+    check("delete removes the entry", await backend.get_entry("page") is None)
+
+    tiered = TieredBackend(LRUCache(ttl_seconds=30, max_entries=16), backend, l1_ttl=30)
+    await tiered.set("tiered", value, ttl=60)
+    tiered.l1.clear()
+    entry = await tiered.get_entry("tiered")
+    check("tiered reads through to redis", entry is not None and entry[0] == value)
+    check("tiered fills L1 from redis", tiered.l1.get("tiered") == value)
+
+    stats = backend.stats()
+    check("stats count hits and misses", stats["hits"] == 3 and stats["misses"] == 3 and stats["stale_hits"] == 1)
+
+    if stand_in is not None:
+        await stand_in.stop()
+        await backend.client.connection_pool.disconnect()
+        errors = backend.errors
+        entry = await backend.get_entry("stale")
+        await backend.set("down", value, ttl=60)
+        check("outage is counted, not raised", entry is None and backend.errors == errors + 2)
+    else:
+        # Leave a real server the way it was found
+        for key in ("stale", "tiered"):
+            await backend.delete(key)
+
+    await backend.close()
+    return failures
+
+
+async def main(url):
+    stand_in = None
+    if url is None:
+        stand_in = await RedisStandIn().start()
+        url = f"redis://127.0.0.1:{stand_in.port}/0"
+    failures = await run_checks(url, stand_in)
+    if stand_in is not None:
+        print(f"Stand-in served: {', '.join(sorted(set(stand_in.commands)))}")
+    print(f"{len(failures)} check(s) failed" if failures else "All checks passed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Check against a real server instead of the stand-in")
+    sys.exit(asyncio.run(main(parser.parse_args().url)))
@@ -0,0 +1,92 @@
+"""Result format shared by the benchmark suite and compared by benchmarks.compare.
+
+A results file is JSON:
+
+    {"suite": "load" | "micro", "meta": {...}, "results": {name: {metric: value}}}
+
+Latency metrics end in _ms (or _ns for micro-benchmarks) and are lower is
+better; throughput metrics end in _per_s and are higher is better.
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+
+def percentile(values, q):
+    # Nearest rank on the sorted samples
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def summarize_latencies(seconds, duration, errors=0):
+    ordered = sorted(seconds)
+    count = len(ordered) + errors
+    summary = {
+        "requests": count,
+        "errors": errors,
+        "error_rate": errors / count if count else 0.0,
+        "throughput_per_s": len(ordered) / duration if duration else 0.0,
+    }
+    for q in (50, 95, 99):
+        value = percentile(ordered, q)
+        summary[f"p{q}_ms"] = value * 1000 if value is not None else None
+    summary["max_ms"] = ordered[-1] * 1000 if ordered else None
+    return summary
+
+
+def git_revision():
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=os.path.dirname(__file__), check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True, text=True, cwd=os.path.dirname(__file__), check=True
+        ).stdout.strip()
+        return f"{revision}-dirty" if dirty else revision
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata(args):
+    return {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "args": {key: value for key, value in vars(args).items() if key != "output"},
+    }
+
+
+def write_results(path, suite, meta, results):
+    with open(path, "w", encoding="utf-8") as output:
+        json.dump({"suite": suite, "meta": meta, "results": results}, output, indent=2)
+        output.write("\n")
+    print(f"Results written to {path}")
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as results:
+        return json.load(results)
+
+
+def format_value(value):
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:,.3f}" if abs(value) < 10 else f"{value:,.1f}"
+    return f"{value:,}"
+
+
+def print_table(results, columns):
+    width = max([len(name) for name in results] + [8])
+    print(f"{'':<{width}}  " + "  ".join(f"{column:>12}" for column in columns))
+    for name, metrics in results.items():
+        print(f"{name:<{width}}  " + "  ".join(f"{format_value(metrics.get(column)):>12}" for column in columns))
@@ -0,0 +1,90 @@
+"""Measures cold start: import time, startup hooks and first-request latency.
+
+Every run is a fresh interpreter so nothing is shared between samples. The
+first request is an image search against a fake Custom Search endpoint; the
+cost of the scraping clients that are imported on first use (scholarly,
+asyncpraw) is reported separately.
+
+    cd backend && python -m benchmarks.startup_time --runs 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+async def child():
+    started = time.perf_counter()
+    from main import app
+    imported = time.perf_counter()
+
+    import httpx
+    from benchmarks.concurrent_search import start_fake_google
+    from app.utils.http import http_client
+
+    booted_at = time.perf_counter()
+    await app.router.startup()
+    booted = time.perf_counter()
+
+    runner = await start_fake_google(latency=0.0)
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://app") as client:
+            request_at = time.perf_counter()
+            response = await client.get("/search", params={"q": "startup", "type": "images", "page_size": 10})
+            responded = time.perf_counter()
+            assert response.status_code == 200
+    finally:
+        await app.router.shutdown()
+        await http_client.close()
+        await runner.cleanup()
+
+    # What the first papers or discussions request pays, unless preloaded
+    deferred_at = time.perf_counter()
+    import asyncpraw
+    from scholarly import scholarly
+    deferred = time.perf_counter()
+
+    print(json.dumps({
+        "import_ms": (imported - started) * 1000,
+        "startup_ms": (booted - booted_at) * 1000,
+        "first_request_ms": (responded - request_at) * 1000,
+        "deferred_imports_ms": (deferred - deferred_at) * 1000
+    }))
+
+
+def main(runs):
+    env = dict(os.environ, GOOGLE_API_BASE_URL="http://127.0.0.1:8765", PRELOAD_CLIENTS="false")
+    for key in ("GOOGLE_API_KEY", "GOOGLE_CX_ID", "YOUTUBE_API_KEY", "REDDIT_CLIENT_ID",
+                "REDDIT_CLIENT_SECRET", "SERPAPI_KEY", "HUGGINGFACE_API_KEY"):
+        env.setdefault(key, "benchmark")
+
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.startup_time", "--child"],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout
+        sample = json.loads(output.strip().splitlines()[-1])
+        sample["process_ms"] = (time.perf_counter() - started) * 1000
+        samples.append(sample)
+
+    print(f"{runs} cold starts, medians:")
+    for key in ("import_ms", "startup_ms", "first_request_ms", "deferred_imports_ms", "process_ms"):
+        print(f"  {key:<20} {statistics.median(sample[key] for sample in samples):8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        asyncio.run(child())
+    else:
+        main(args.runs)
@@ -2,6 +2,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.api.search import router
+from app.utils.metrics import ServerTimingMiddleware
 
 app = FastAPI(title="Neural Seek API")
 
@@ -15,6 +16,9 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
+if settings.SERVER_TIMING:
+    app.add_middleware(ServerTimingMiddleware)
+
 app.include_router(router)
 
 if __name__ == "__main__":
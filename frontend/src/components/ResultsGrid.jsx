@@ -1,4 +1,4 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { FiLoader } from 'react-icons/fi';
 import AISummary from './AISummary';
@@ -153,6 +153,13 @@ const VirtualizedResults = ({ results, renderItem }) => {
   );
 };
 
+// AI summary and sentiment arrive after the results, merged in by result id
+const mergeEnrichment = (results, updates) => results.map(result => (
+  updates[result.id]
+    ? { ...result, additional_info: { ...(result.additional_info || {}), ...updates[result.id] } }
+    : result
+));
+
 const ResultsGrid = ({ type, query }) => {
   const [results, setResults] = useState([]);
   const [loading, setLoading] = useState(false);
@@ -162,6 +169,43 @@ const ResultsGrid = ({ type, query }) => {
   const [hasMore, setHasMore] = useState(true);
   const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [debouncedQuery, setDebouncedQuery] = useState(query);
+  const enrichmentStreams = useRef([]);
+
+  // Close enrichment streams of the previous search and on unmount
+  useEffect(() => {
+    return () => {
+      enrichmentStreams.current.forEach(stream => stream.close());
+      enrichmentStreams.current = [];
+    };
+  }, [debouncedQuery, type]);
+
+  const subscribeToEnrichments = useCallback((enrichmentId, cacheKey) => {
+    const stream = new EventSource(`${searchService.baseUrl}/enrichments/${enrichmentId}/events`);
+    enrichmentStreams.current.push(stream);
+
+    const apply = (updates) => {
+      setResults(prev => mergeEnrichment(prev, updates));
+      // Keep the cached page in sync so revisiting it shows the enrichments
+      const cached = cache.get(cacheKey);
+      if (cached) {
+        cached.data.results = mergeEnrichment(cached.data.results, updates);
+      }
+    };
+
+    stream.addEventListener('summary', (event) => {
+      const { result_id, ai_summary, summary_sources } = JSON.parse(event.data);
+      apply({ [result_id]: { ai_summary, summary_sources } });
+    });
+    stream.addEventListener('sentiment', (event) => {
+      apply(JSON.parse(event.data));
+    });
+    const close = () => {
+      stream.close();
+      enrichmentStreams.current = enrichmentStreams.current.filter(item => item !== stream);
+    };
+    stream.addEventListener('done', close);
+    stream.onerror = close;
+  }, []);
 
   // Debounced search
   useEffect(() => {
@@ -193,7 +237,8 @@ const ResultsGrid = ({ type, query }) => {
         q: debouncedQuery,
         type: type,
         page: page.toString(),
-        page_size: '20'
+        page_size: '20',
+        enrich: 'deferred'
       });
 
       if (nextPageToken) {
@@ -228,13 +273,17 @@ const ResultsGrid = ({ type, query }) => {
       
       setNextPageToken(data.next_page_token);
       setHasMore(data.has_more);
+
+      if (data.enrichment_id) {
+        subscribeToEnrichments(data.enrichment_id, cacheKey);
+      }
     } catch (err) {
       console.error('Search error:', err);
       setError(err.message);
     } finally {
       setLoading(false);
     }
-  }, [debouncedQuery, type, page, nextPageToken]);
+  }, [debouncedQuery, type, page, nextPageToken, subscribeToEnrichments]);
 
   useEffect(() => {
     fetchResults();
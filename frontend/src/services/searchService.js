@@ -4,6 +4,8 @@ const MAX_HISTORY_ITEMS = 10;
 class SearchService {
   constructor() {
     this.baseUrl = 'https://neuraseekng-backend.up.railway.app';
+    // Lets the backend drop suggestion requests this tab has already typed past
+    this.clientId = Math.random().toString(36).slice(2);
   }
 
   // Search History Methods
@@ -43,7 +45,7 @@ class SearchService {
     
     try {
       const response = await fetch(
-        `${this.baseUrl}/suggestions?q=${encodeURIComponent(query)}`,
+        `${this.baseUrl}/suggestions?q=${encodeURIComponent(query)}&client=${this.clientId}`,
         {
           method: 'GET',
           headers: {